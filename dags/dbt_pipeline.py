@@ -2,7 +2,7 @@ from airflow import DAG
 from datetime import datetime, timedelta
 from airflow.operators.bash import BashOperator
 from airflow.operators.python import PythonOperator
-from scripts.data_utils.elt import extract_telegram_channels, load_data_mongo, transform
+from scripts.data_utils.elt import run_etl_pipeline
 
 default_args = {
     'owner': 'airflow',
@@ -31,27 +31,13 @@ dbt_test = BashOperator(
     dag=dag,
 )
 
-dbt_run >> dbt_test  # Run models first, then test
-
-
-# extract = PythonOperator(
-#     task_id='extract',
-#     provide_context=True,
-#     python_callable=extract_telegram_channels,
-#     dag=dag)
-
-# load = PythonOperator(
-#     task_id='load_to_mongodb',
-#     provide_context=True,
-#     python_callable=load_data_mongo,
-#     dag=dag)
-
-# transform = PythonOperator(
-#     task_id='load_to_mongodb',
-#     provide_context=True,
-#     python_callable=load_data_mongo,
-#     dag=dag)
+# Scrape, store, clean, detect and load new messages in one pipelined pass
+etl = PythonOperator(
+    task_id='run_etl_pipeline',
+    python_callable=run_etl_pipeline,
+    dag=dag,
+)
 
-# extract >> load >> transform
+etl >> dbt_run >> dbt_test  # Load fresh data, run models, then test
 
-# airflow scheduler
\ No newline at end of file
+# airflow scheduler
@@ -0,0 +1,154 @@
+import time
+import asyncio
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item requests into batched calls.
+
+    Items submitted while the worker is idle start a new batch; the batch is closed
+    when it reaches `max_batch_size` or `max_wait_ms` after its first item, then
+    `batch_fn` runs in an executor so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 32, max_wait_ms: float = 5.0, executor: Optional[Executor] = None, name: str = "batcher"):
+        """
+        Args:
+            batch_fn (Callable): Takes a list of items and returns one result per item, in order.
+            max_batch_size (int): Upper bound on items per call.
+            max_wait_ms (float): How long to wait for more items after the first one arrives.
+            executor (Optional[Executor]): Where `batch_fn` runs. Defaults to the loop's executor.
+            name (str): Label used in stats.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.name = name
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Stats
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._batch_sizes: Counter = Counter()
+        self._busy_seconds = 0.0
+        self._max_queue_depth = 0
+
+    async def start(self) -> None:
+        """Start the batching worker on the running loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(), name=f"{self.name}-worker")
+
+    async def stop(self) -> None:
+        """Cancel the worker and fail any requests still queued."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} stopped"))
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result."""
+        if not self.running:
+            raise RuntimeError(f"{self.name} is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """Queue several items; they may be split across or merged with other batches."""
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for the first item, then gather more until the batch is full or the window closes."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        try:
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already waiting without suspending
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Not wait_for: before Python 3.12 it can drop an item that arrives as the timeout fires
+                getter = asyncio.ensure_future(self._queue.get())
+                try:
+                    await asyncio.wait({getter}, timeout=remaining)
+                finally:
+                    # A pending get() leaves the item queued when cancelled
+                    if not getter.cancel() and not getter.cancelled():
+                        batch.append(getter.result())
+        except asyncio.CancelledError:
+            # Stopped mid-window: the collected items are no longer in the queue for stop() to fail
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"{self.name} stopped"))
+            raise
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Skip requests whose callers already went away
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                self._errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                self._busy_seconds += time.perf_counter() - started
+                self._batches += 1
+                self._items += len(items)
+                self._batch_sizes[len(items)] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and batch-size metrics."""
+        return {
+            "name": self.name,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self._max_queue_depth,
+            "batches": self._batches,
+            "items": self._items,
+            "errors": self._errors,
+            "avg_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+            "max_batch_size": max(self._batch_sizes) if self._batch_sizes else 0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "busy_seconds": round(self._busy_seconds, 6),
+            "config": {"max_batch_size": self.max_batch_size, "max_wait_ms": self.max_wait * 1000.0},
+        }
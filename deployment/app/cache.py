@@ -0,0 +1,74 @@
+import time
+import inspect
+import threading
+from functools import wraps
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key, dropping it if expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+def ttl_cache(ttl: float = 30.0, maxsize: int = 1024, cache: Optional[TTLCache] = None) -> Callable:
+    """Cache a function's results per argument tuple for `ttl` seconds."""
+    cache = cache or TTLCache(ttl, maxsize)
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                hit, value = cache.get(key)
+                if hit:
+                    return value
+                value = await func(*args, **kwargs)
+                cache.set(key, value)
+                return value
+
+            async_wrapper.cache = cache
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
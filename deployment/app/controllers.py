@@ -1,41 +1,134 @@
+import os
+import re
+import json
+import base64
+import binascii
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import Any, Dict, List, Optional
+
+import database
 from models import CleanedData
-from sqlalchemy.orm import Session
-from database import mongo_db, SessionLocal
+from cache import ttl_cache
+from indexes import BUSINESS_NAME_KEY, DATE_FIELDS, normalize_business_name
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CACHE_TTL = float(os.getenv("API_CACHE_TTL", "30"))
+MAX_LIMIT = 1000
+
+# ==========================================
+# Keyset Pagination Helpers
+# ==========================================
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$oid" in value:
+        return ObjectId(value["$oid"])
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last returned document as an opaque cursor."""
+    payload = json.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        return [_decode_value(value) for value in json.loads(payload)]
+    except (ValueError, TypeError, InvalidId, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def parse_fields(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    """Turn a comma-separated `fields` parameter into a Mongo projection."""
+    if not fields:
+        return None
+    projection = {field.strip(): 1 for field in fields.split(",") if field.strip()}
+    return projection or None
+
+async def _page(collection_name: str, query: Dict[str, Any], limit: int, cursor: Optional[str], fields: Optional[str], sort: str) -> Dict[str, Any]:
+    """
+    Fetch one page with keyset pagination.
+
+    Rather than skipping over earlier pages, the query resumes strictly after the last
+    (date, _id) or _id returned, so every page is a bounded index range scan.
+    """
+    collection = database.get_mongo_db()[collection_name]
+    limit = max(1, min(limit, MAX_LIMIT))
+    query = dict(query)
+    projection = parse_fields(fields)
+
+    if sort == "date":
+        date_field = DATE_FIELDS[collection_name]
+        sort_keys = [(date_field, 1), ("_id", 1)]
+        if projection is not None:
+            projection[date_field] = 1
+        if cursor:
+            last_date, last_id = decode_cursor(cursor)
+            query["$or"] = [
+                {date_field: {"$gt": last_date}},
+                {date_field: last_date, "_id": {"$gt": last_id}},
+            ]
+    else:
+        sort_keys = [("_id", 1)]
+        if cursor:
+            (last_id,) = decode_cursor(cursor)
+            query["_id"] = {"$gt": last_id}
+
+    data = await collection.find(query, projection).sort(sort_keys).limit(limit).to_list(length=limit)
+
+    next_cursor = None
+    if len(data) == limit:
+        last = data[-1]
+        next_cursor = encode_cursor([last.get(key) for key, _ in sort_keys])
 
-# Fetch Scraped Data from MongoDB
-def get_scraped_data(limit: int = 10):
-    collection = mongo_db["raw_data"]
-    data = list(collection.find().limit(limit))
     for doc in data:
         doc["_id"] = str(doc["_id"])  # Convert ObjectId to string
-    return data
+
+    return {"data": data, "next_cursor": next_cursor}
+
+# Fetch Scraped Data from MongoDB
+@ttl_cache(ttl=CACHE_TTL)
+async def get_scraped_data(limit: int = 10, cursor: Optional[str] = None, fields: Optional[str] = None, sort: str = "id"):
+    return await _page("raw_data", {}, limit, cursor, fields, sort)
 
 # Fetch Cleaned Data from MongoDB
-def get_cleaned_data(business_name: str = None, limit: int = 10):
-    collection = mongo_db["cleaned_data"]
+@ttl_cache(ttl=CACHE_TTL)
+async def get_cleaned_data(business_name: str = None, limit: int = 10, cursor: Optional[str] = None, fields: Optional[str] = None, sort: str = "id", match: str = "prefix", q: Optional[str] = None):
     query = {}
     if business_name:
-        query["business_name"] = {"$regex": business_name, "$options": "i"}
-    
-    data = list(collection.find(query).limit(limit))
-    for doc in data:
-        doc["_id"] = str(doc["_id"])
-    
-    return data
+        name = normalize_business_name(business_name)
+        # Exact and anchored case-sensitive prefix matches on the normalized field can use its index
+        query[BUSINESS_NAME_KEY] = name if match == "exact" else {"$regex": f"^{re.escape(name)}"}
+    if q:
+        query["$text"] = {"$search": q}
+
+    return await _page("cleaned_data", query, limit, cursor, fields, sort)
 
 # Fetch Object Detection Results from MongoDB
-def get_detected_objects(object_class: str = None, limit: int = 10):
-    collection = mongo_db["detected_objects"]
+@ttl_cache(ttl=CACHE_TTL)
+async def get_detected_objects(object_class: str = None, limit: int = 10, cursor: Optional[str] = None, fields: Optional[str] = None, sort: str = "id"):
     query = {}
     if object_class:
-        query["detections.class"] = {"$regex": object_class, "$options": "i"}
-    
-    data = list(collection.find(query).limit(limit))
-    for doc in data:
-        doc["_id"] = str(doc["_id"])
-    
-    return data
+        # YOLO class names are lowercase; exact match uses the multikey index
+        query["detections.class"] = object_class.strip().lower()
+
+    return await _page("detected_objects", query, limit, cursor, fields, sort)
 
 # Fetch Cleaned Data from PostgreSQL
-def get_cleaned_data_pg(db: Session, limit: int = 10):
-    return db.query(CleanedData).limit(limit).all()
+async def get_cleaned_data_pg(db: AsyncSession, limit: int = 10, after_id: Optional[int] = None):
+    query = select(CleanedData)
+    if after_id is not None:
+        query = query.where(CleanedData.id > after_id)
+    result = await db.execute(query.order_by(CleanedData.id).limit(max(1, min(limit, MAX_LIMIT))))
+    return result.scalars().all()
@@ -0,0 +1,104 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from batching import MicroBatcher
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.result_cache import ResultCache, hash_bytes
+
+# YOLO settings for on-demand detection
+YOLO_MODEL = os.getenv("YOLO_MODEL", "yolov8n.pt")
+DETECT_IMGSZ = int(os.getenv("DETECT_IMGSZ", "640"))
+DETECT_MAX_BATCH = int(os.getenv("DETECT_MAX_BATCH", "16"))
+DETECT_MAX_WAIT_MS = float(os.getenv("DETECT_MAX_WAIT_MS", "10"))
+DETECT_DECODE_WORKERS = int(os.getenv("DETECT_DECODE_WORKERS", str(os.cpu_count() or 1)))
+MAX_UPLOAD_BYTES = int(os.getenv("DETECT_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+class DetectionService:
+    """
+    On-demand YOLO detection for uploaded image bytes.
+
+    Uploads are keyed by content hash. Each micro-batch hashes and decodes its
+    uploads on a thread pool (never on the event loop), looks the hashes up in the
+    detection cache, and runs only the misses through the model in a single call.
+    """
+
+    def __init__(self, model_name: str = YOLO_MODEL, imgsz: int = DETECT_IMGSZ, max_batch_size: int = DETECT_MAX_BATCH, max_wait_ms: float = DETECT_MAX_WAIT_MS, decode_workers: int = DETECT_DECODE_WORKERS, cache_path: Optional[str] = None):
+        self.model_name = model_name
+        self.imgsz = imgsz
+        self.cache_path = cache_path
+        self.model = None
+        self.cache: Optional[ResultCache] = None
+        self._yolo = None
+
+        self._decode_pool = ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="detect-decode")
+        self.batcher = MicroBatcher(
+            self._detect_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            executor=ThreadPoolExecutor(max_workers=1, thread_name_prefix="detect"),
+            name="detect",
+        )
+        self._cache_hits = 0
+
+    def load(self) -> None:
+        """Load the YOLO model and open its detection cache (blocking)."""
+        from scripts.modeling import yolo
+
+        self._yolo = yolo
+        self.model = yolo.get_model(self.model_name)
+        self.cache = yolo.get_detection_cache(self.model, db_path=self.cache_path, imgsz=self.imgsz)
+
+    async def start(self) -> None:
+        await self.batcher.start()
+
+    async def stop(self) -> None:
+        await self.batcher.stop()
+        if self.cache is not None:
+            self.cache.close()
+
+    @property
+    def running(self) -> bool:
+        return self.batcher.running
+
+    def _detect_batch(self, items: List[bytes]) -> List[Optional[Dict[str, Any]]]:
+        """Resolve a batch of encoded images; None marks an undecodable image."""
+        # Hashing runs here, in the batch executor, so large uploads never block the event loop
+        items = [{"hash": content_hash, "data": data} for content_hash, data in zip(self._decode_pool.map(hash_bytes, items), items)]
+        hashes = [item["hash"] for item in items]
+        found = self._yolo.cached_detections(self.cache, hashes)
+        self._cache_hits += sum(1 for content_hash in hashes if content_hash in found)
+
+        # Identical uploads in the same batch are decoded and detected once
+        misses = {item["hash"]: item["data"] for item in items if item["hash"] not in found}
+        decoded = dict(zip(misses, self._decode_pool.map(self._yolo.decode_image, misses.values())))
+        valid = [content_hash for content_hash, image in decoded.items() if image is not None]
+
+        if valid:
+            detections = self._yolo.detect_arrays(self.model, [decoded[content_hash] for content_hash in valid], imgsz=self.imgsz)
+            computed = dict(zip(valid, detections))
+            self._yolo.store_detections(self.cache, computed)
+        else:
+            computed = {}
+
+        results = []
+        for content_hash in hashes:
+            if content_hash in found:
+                results.append({"content_hash": content_hash, "cached": True, "detections": found[content_hash]})
+            elif content_hash in computed:
+                results.append({"content_hash": content_hash, "cached": False, "detections": computed[content_hash]})
+            else:
+                results.append(None)
+        return results
+
+    async def detect(self, data: bytes) -> Optional[Dict[str, Any]]:
+        """Detect objects in one encoded image; returns None if it cannot be decoded."""
+        return await self.batcher.submit(data)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.batcher.stats()
+        stats["cache_hits"] = self._cache_hits
+        stats["model"] = self.model_name
+        return stats
@@ -0,0 +1,100 @@
+import io
+import os
+import sys
+import csv
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from sqlalchemy import select, inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import database
+from models import CleanedData
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.serialization import dumps_bytes, default
+
+EXPORT_BATCH_SIZE = 1000
+FLUSH_BYTES = 1 << 16
+
+# Mongo collection behind each exportable dataset
+MONGO_DATASETS = {
+    "scraped-data": "raw_data",
+    "cleaned-data": "cleaned_data",
+    "detected-objects": "detected_objects",
+}
+
+# ==========================================
+# Record Sources
+# ==========================================
+
+async def iter_mongo(collection_name: str, projection: Optional[Dict[str, int]] = None, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """Stream documents from a Mongo collection in server-side batches, ordered by _id."""
+    collection = database.get_mongo_db()[collection_name]
+    cursor = collection.find({}, projection).sort("_id", 1).batch_size(batch_size)
+    async for doc in cursor:
+        yield doc
+
+async def iter_postgres(db: AsyncSession, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """Stream cleaned_data rows from Postgres with a server-side cursor."""
+    columns = [column.key for column in sa_inspect(CleanedData).mapper.column_attrs]
+    result = await db.stream(select(CleanedData).order_by(CleanedData.id).execution_options(yield_per=batch_size))
+    async for row in result.scalars():
+        yield {column: getattr(row, column) for column in columns}
+
+# ==========================================
+# Encoders
+# ==========================================
+
+async def encode_ndjson(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode records as newline-delimited JSON, yielding ~64KB blocks."""
+    buffer = bytearray()
+    async for record in records:
+        buffer += dumps_bytes(record) + b"\n"
+        if len(buffer) >= FLUSH_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return dumps_bytes(value).decode("utf-8")
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return default(value)
+
+async def encode_csv(records: AsyncIterator[Dict[str, Any]], fieldnames: Optional[List[str]] = None) -> AsyncIterator[bytes]:
+    """
+    Encode records as CSV, yielding ~64KB blocks.
+
+    The header is `fieldnames` when given, otherwise the keys of the first record;
+    keys missing from a record are left empty and extra keys are dropped.
+    """
+    text = io.StringIO()
+    writer = None
+    async for record in records:
+        if writer is None:
+            writer = csv.DictWriter(text, fieldnames=fieldnames or list(record.keys()), restval="", extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: _csv_value(value) for key, value in record.items()})
+        if text.tell() >= FLUSH_BYTES:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_stream(records: AsyncIterator[Dict[str, Any]], fmt: str, fieldnames: Optional[Iterable[str]] = None, compress: bool = False) -> AsyncIterator[bytes]:
+    """Build the byte stream for an export response."""
+    stream = encode_csv(records, list(fieldnames) if fieldnames else None) if fmt == "csv" else encode_ndjson(records)
+    return gzip_stream(stream) if compress else stream
@@ -0,0 +1,57 @@
+import os
+import sys
+import logging
+from pymongo import ASCENDING, TEXT
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+# Shared with MongoDBStorage, which sets the key on every write
+from scripts.utils.records import BUSINESS_NAME_KEY, normalize_business_name
+
+logger = logging.getLogger(__name__)
+
+# Date field used for keyset pagination in each collection
+DATE_FIELDS = {
+    "raw_data": "Date",
+    "cleaned_data": "scraped_date",
+    "detected_objects": "detected_at",
+}
+
+async def backfill_business_names(db: AsyncIOMotorDatabase) -> int:
+    """
+    Populate business_name_lower on documents written before MongoDBStorage set it.
+
+    A one-off migration for old data; new writes carry the key already.
+    """
+    result = await db["cleaned_data"].update_many(
+        {BUSINESS_NAME_KEY: {"$exists": False}, "business_name": {"$type": "string"}},
+        [{"$set": {BUSINESS_NAME_KEY: {"$toLower": {"$trim": {"input": "$business_name"}}}}}]
+    )
+    return result.modified_count
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """
+    Create the indexes the read endpoints rely on. Safe to call on every startup.
+
+    - cleaned_data: (business_name_lower, _id) for anchored prefix / exact filters with
+      keyset pagination, plus a text index for free-text search.
+    - detected_objects: multikey (detections.class, _id) for exact class filters.
+    - every paginated collection: (date field, _id) for `sort=date` keyset pages.
+    """
+    cleaned = db["cleaned_data"]
+    await cleaned.create_index([(BUSINESS_NAME_KEY, ASCENDING), ("_id", ASCENDING)], name="business_name_lower_id")
+    await cleaned.create_index(
+        [("business_name", TEXT), ("message_text", TEXT), ("address", TEXT)],
+        name="cleaned_data_text",
+        default_language="none"  # Amharic/English mix: no stemming or stop words
+    )
+
+    detected = db["detected_objects"]
+    await detected.create_index([("detections.class", ASCENDING), ("_id", ASCENDING)], name="detections_class_id")
+
+    for collection_name, date_field in DATE_FIELDS.items():
+        await db[collection_name].create_index([(date_field, ASCENDING), ("_id", ASCENDING)], name=f"{date_field}_id")
+
+    backfilled = await backfill_business_names(db)
+    if backfilled:
+        logger.info(f"Backfilled {BUSINESS_NAME_KEY} on {backfilled} cleaned_data documents.")
@@ -1,75 +1,222 @@
-import os, sys, logging
+import os, sys, logging, asyncio
 from typing import List, Union
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 import uvicorn
-from sqlalchemy.orm import Session
-from fastapi import FastAPI, Query, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import FastAPI, Query, Depends, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse, PlainTextResponse
 
-import controllers, schemas, prediction, database
+import controllers, schemas, prediction, database, indexes, exports
+from batching import MicroBatcher
+from detection import DetectionService, MAX_UPLOAD_BYTES
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 try:
     from scripts.utils.logger import setup_logger
+    from scripts.utils.metrics import REGISTRY, render_prometheus
 except ImportError as e:
     logging(f"Import error: {e}. Please check the module path.")
 
 # Setup logger for deployement
 log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
-logger = setup_logger("fastapi_deployement", log_dir)
+logger = setup_logger("fastapi_deployement", log_dir, use_queue=True)  # Never block the event loop on log I/O
+
+# Micro-batching for /predict/: concurrent requests share one model call
+PREDICT_MAX_BATCH = int(os.getenv("PREDICT_MAX_BATCH", "32"))
+PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", "5"))
+predict_batcher = MicroBatcher(
+    prediction.predict_batch,
+    max_batch_size=PREDICT_MAX_BATCH,
+    max_wait_ms=PREDICT_MAX_WAIT_MS,
+    executor=ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict"),
+    name="predict",
+)
+detection_service = DetectionService()
+
+BATCHER_QUEUE_DEPTH = REGISTRY.gauge("api_batcher_queue_depth", "Requests waiting in a micro-batcher.")
+BATCHER_BATCHES = REGISTRY.gauge("api_batcher_batches", "Batches run by a micro-batcher since startup.")
+BATCHER_ITEMS = REGISTRY.gauge("api_batcher_items", "Items processed by a micro-batcher since startup.")
+BATCHER_AVG_BATCH = REGISTRY.gauge("api_batcher_avg_batch_size", "Mean items per batch since startup.")
+BATCHER_ERRORS = REGISTRY.gauge("api_batcher_errors", "Failed batches since startup.")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open database clients on startup and close them on shutdown."""
+    await database.connect()
+    logger.info("Database clients initialised.")
+    try:
+        await indexes.ensure_indexes(database.get_mongo_db())
+        logger.info("MongoDB indexes ensured.")
+    except Exception as e:
+        logger.error(f"Failed to ensure MongoDB indexes: {e}")
+    try:
+        await asyncio.to_thread(prediction.load_model)
+        await predict_batcher.start()
+    except Exception as e:
+        logger.error(f"Prediction model unavailable: {e}")
+    try:
+        await asyncio.to_thread(detection_service.load)
+        await detection_service.start()
+    except Exception as e:
+        logger.error(f"Detection model unavailable: {e}")
+    try:
+        yield
+    finally:
+        await detection_service.stop()
+        await predict_batcher.stop()
+        await database.disconnect()
+        logger.info("Database clients closed.")
 
 # Initialize FastAPI
-app = FastAPI(title="Medical Business API", version="1.0")
+app = FastAPI(title="Medical Business API", version="1.0", lifespan=lifespan)
+
+# Shared pagination/projection parameters
+CURSOR_QUERY = Query(None, description="Opaque cursor from the previous page's next_cursor")
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, e.g. 'business_name,scraped_date'")
+SORT_QUERY = Query("id", pattern="^(id|date)$", description="Keyset order: 'id' or 'date'")
+
+async def paginated(fetch, *args, **kwargs):
+    """Run a paginated controller call, mapping bad cursors to 400."""
+    try:
+        return await fetch(*args, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Get Scraped Data from MongoDB**
 @app.get("/scraped-data", tags=["Scraped Data"])
-def get_scraped_data(limit: int = Query(10, description="Number of records to fetch")):
-    return {"data": controllers.get_scraped_data(limit)}
+async def get_scraped_data(
+    limit: int = Query(10, description="Number of records to fetch"),
+    cursor: str = CURSOR_QUERY,
+    fields: str = FIELDS_QUERY,
+    sort: str = SORT_QUERY,
+):
+    return await paginated(controllers.get_scraped_data, limit, cursor, fields, sort)
 
 # Get Cleaned Data from MongoDB**
 @app.get("/cleaned-data", tags=["Cleaned Data"])
-def get_cleaned_data(
-    business_name: str = Query(None, description="Filter by business name"),
+async def get_cleaned_data(
+    business_name: str = Query(None, description="Filter by business name (case-insensitive)"),
+    match: str = Query("prefix", pattern="^(prefix|exact)$", description="Business name match mode"),
+    q: str = Query(None, description="Free-text search over name, message and address"),
     limit: int = Query(10, description="Number of records to fetch"),
+    cursor: str = CURSOR_QUERY,
+    fields: str = FIELDS_QUERY,
+    sort: str = SORT_QUERY,
 ):
-    return {"data": controllers.get_cleaned_data(business_name, limit)}
+    return await paginated(controllers.get_cleaned_data, business_name, limit, cursor, fields, sort, match, q)
 
 # Get Object Detection Results from MongoDB**
 @app.get("/detected-objects", tags=["Object Detection"])
-def get_detected_objects(
-    object_class: str = Query(None, description="Filter by object class"),
+async def get_detected_objects(
+    object_class: str = Query(None, description="Filter by exact object class, e.g. 'bottle'"),
     limit: int = Query(10, description="Number of records to fetch"),
+    cursor: str = CURSOR_QUERY,
+    fields: str = FIELDS_QUERY,
+    sort: str = SORT_QUERY,
 ):
-    return {"data": controllers.get_detected_objects(object_class, limit)}
+    return await paginated(controllers.get_detected_objects, object_class, limit, cursor, fields, sort)
 
 # Get Cleaned Data from PostgreSQL**
 @app.get("/cleaned-data-pg", tags=["Cleaned Data"], response_model=list[schemas.CleanedDataSchema])
-def get_cleaned_data_pg(
+async def get_cleaned_data_pg(
     limit: int = Query(10, description="Number of records to fetch"),
-    db: Session = Depends(database.get_db),
+    after_id: int = Query(None, description="Return rows with id greater than this (keyset pagination)"),
+    db: AsyncSession = Depends(database.get_db),
+):
+    return await controllers.get_cleaned_data_pg(db, limit, after_id)
+
+# Stream a full dataset as NDJSON or CSV**
+@app.get("/export/{dataset}", tags=["Export"])
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Output format"),
+    fields: str = FIELDS_QUERY,
+    gzip: bool = Query(False, description="Gzip-compress the response body"),
+    batch_size: int = Query(exports.EXPORT_BATCH_SIZE, ge=1, le=10_000, description="Server-side cursor batch size"),
+    db: AsyncSession = Depends(database.get_db),
 ):
-    return controllers.get_cleaned_data_pg(db, limit)
+    fieldnames = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+    if dataset in exports.MONGO_DATASETS:
+        records = exports.iter_mongo(exports.MONGO_DATASETS[dataset], controllers.parse_fields(fields), batch_size)
+    elif dataset == "cleaned-data-pg":
+        records = exports.iter_postgres(db, batch_size)
+    else:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="{dataset}.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(exports.export_stream(records, format, fieldnames, gzip), media_type=media_type, headers=headers)
+
+# Prometheus scrape endpoint**
+@app.get("/metrics", tags=["Monitoring"], response_class=PlainTextResponse)
+async def metrics():
+    for stats in (predict_batcher.stats(), detection_service.stats()):
+        BATCHER_QUEUE_DEPTH.set(stats["queue_depth"], batcher=stats["name"])
+        BATCHER_BATCHES.set(stats["batches"], batcher=stats["name"])
+        BATCHER_ITEMS.set(stats["items"], batcher=stats["name"])
+        BATCHER_AVG_BATCH.set(stats["avg_batch_size"], batcher=stats["name"])
+        BATCHER_ERRORS.set(stats["errors"], batcher=stats["name"])
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 @app.get("/", tags=["Root"])
-def root():
+async def root():
     return {"message": "Welcome to the Medical Business API!"}
 
 @app.post("/predict/", response_model=Union[schemas.PredictionOutput, list[schemas.PredictionOutput]])
 async def predict(
-    input_image: Union[schemas.PredictionInput, List[schemas.PredictionInput], dict], 
+    input_data: Union[schemas.PredictionInput, List[schemas.PredictionInput]],
     # db: Session = Depends(database.get_db)
 ):
-
-    logger.info("Starting unified prediction endpoint...")
+    if not predict_batcher.running:
+        raise HTTPException(status_code=503, detail="Prediction model is not loaded.")
 
     try:
-        predictions = prediction.make_prediction(input_image.model_dump())
-        logger.info("Successfully completed batch prediction.")
-        return {"Predictions": predictions}
+        if isinstance(input_data, list):
+            return await predict_batcher.submit_many([item.model_dump() for item in input_data])
+        return await predict_batcher.submit(input_data.model_dump())
 
     except Exception as e:
         logger.error("Error in prediction endpoint: %s", str(e))
         raise HTTPException(status_code=500, detail="Internal Server Error.")
 
+@app.get("/predict/stats", tags=["Prediction"])
+async def predict_stats():
+    return predict_batcher.stats()
+
+@app.post("/detect", tags=["Object Detection"])
+async def detect(files: List[UploadFile] = File(..., description="Images to run object detection on")):
+    if not detection_service.running:
+        raise HTTPException(status_code=503, detail="Detection model is not loaded.")
+
+    uploads = []
+    for upload in files:
+        data = await upload.read(MAX_UPLOAD_BYTES + 1)
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"{upload.filename} exceeds {MAX_UPLOAD_BYTES} bytes.")
+        uploads.append((upload.filename, data))
+
+    try:
+        results = await asyncio.gather(*(detection_service.detect(data) for _, data in uploads))
+    except Exception as e:
+        logger.error("Error in detection endpoint: %s", str(e))
+        raise HTTPException(status_code=500, detail="Internal Server Error.")
+
+    invalid = [filename for (filename, _), result in zip(uploads, results) if result is None]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Could not decode image(s): {', '.join(map(str, invalid))}")
+
+    return [{"filename": filename, **result} for (filename, _), result in zip(uploads, results)]
+
+@app.get("/detect/stats", tags=["Object Detection"])
+async def detect_stats():
+    return detection_service.stats()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=7777, reload=True)
     # uvicorn app.main:app --reload --host 0.0.0.0 --port 7777
\ No newline at end of file
@@ -1,13 +1,8 @@
 import os
 import sys
-import joblib
 import logging
 from typing import List, Union
 
-import pandas as pd
-import tensorflow.keras.backend as K
-from tensorflow.keras.models import load_model 
-
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
 try:
@@ -19,28 +14,50 @@ except ImportError as e:
 log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
 logger = setup_logger("deployement", log_dir)  
 
-# resources_dir = os.path.join('resources')
-# model_path = os.path.join(resources_dir, 'model.pkl')
+# Trained model, loaded once by `load_model()` from the app lifespan
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'resources', 'models', 'model.pkl'))
+model = None
+
+def load_model(model_path: str = MODEL_PATH):
+    """Load the trained model into the module-level slot (idempotent)."""
+    global model
+    if model is None:
+        import joblib  # heavy; only needed once the lifespan loads the model
+
+        logger.info(f"Starting to load the trained model from {model_path}...")
+        model = joblib.load(model_path)
+        logger.info("Successfully loaded the trained model.")
+    return model
+
+def is_loaded() -> bool:
+    return model is not None
+
+def predict_batch(inputs: List[dict]) -> List[dict]:
+    """
+    Run the model once over a batch of inputs.
+
+    Args:
+        inputs (List[dict]): `PredictionInput` dicts; the model is fed their `content`.
+
+    Returns:
+        List[dict]: One `PredictionOutput` dict per input, in order.
+    """
+    if model is None:
+        raise RuntimeError("Model is not loaded")
+
+    import pandas as pd
+
+    predictions = model.predict(pd.Series([item.get("content", "") for item in inputs]))
+    predictions = predictions.tolist() if hasattr(predictions, "tolist") else list(predictions)
 
-# # Load the trained model
-# try:
-#     logger.info("Starting to load the trained model...")
-#     model = joblib.load(model_path)
-#     # model = load_model(model_path, custom_objects=None)
-#     logger.info("Successfully loaded the trained model.")
-# except Exception as e:
-#     logger.error(f"Error initializing application: {e}")
-#     raise
+    return [
+        {"name": item.get("name", ""), "content": item.get("content", ""), "path": item.get("path", ""), "prediction": value}
+        for item, value in zip(inputs, predictions)
+    ]
 
 def make_prediction(input_data: Union[dict, List[dict]]) -> Union[dict, List[dict]]:
-    
+    """Predict for one input or a list of inputs without going through the micro-batcher."""
     logger.info("Starting prediction...")
-    
-    # # Generate predictions
-    # predictions = model.predict(input_data)
-    # logger.info("Prediction made successfully.")
-    
-    # # Return predictions as list
-    # prediction = predictions.flatten().tolist()
-    # logger.info(prediction)
-    # return prediction
+    if isinstance(input_data, dict):
+        return predict_batch([input_data])[0]
+    return predict_batch(input_data)
@@ -1,10 +1,11 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, List, Optional
 
 class PredictionOutput(BaseModel):
     name: str
     content: str
     path: str
+    prediction: Optional[Any] = None
 
 class PredictionInput(BaseModel):
     id: int
@@ -0,0 +1,56 @@
+{#
+    Helpers shared by the incremental models.
+
+    incremental_window: on incremental runs, only read rows loaded after the newest
+    one already in the target. The watermark is raw_data's SERIAL `id` (carried
+    downstream as `raw_id`), i.e. load order rather than message time, so backfills,
+    retried channels and quiet channels loaded late are still picked up. Pass
+    `source_column` when the filtered column has another name or needs a table alias.
+
+    replace_window_groups: pre-hook for the bridge models. delete+insert only deletes
+    keys that appear in the new rows, so a group whose array became empty would keep
+    its old rows; this deletes every group in the incoming window up front instead.
+
+    create_index: idempotent CREATE INDEX for post-hooks on the model's own table.
+
+    optional_column: select `column` from `relation` when it exists, else a typed NULL
+    under the same name, so models over columns the loader does not write yet still build.
+#}
+
+{% macro incremental_window(column='raw_id', keyword='WHERE', source_column=none) %}
+    {%- if is_incremental() %}
+    {{ keyword }} {{ source_column or column }} > (
+        SELECT COALESCE(MAX({{ column }}), 0)
+        FROM {{ this }}
+    )
+    {%- endif %}
+{% endmacro %}
+
+{% macro replace_window_groups(relation, key='group_id', column='raw_id') %}
+    {%- if is_incremental() %}
+    DELETE FROM {{ this }}
+    WHERE {{ key }} IN (
+        SELECT {{ key }}
+        FROM {{ relation }}
+        WHERE {{ column }} > (
+            SELECT COALESCE(MAX({{ column }}), 0)
+            FROM {{ this }}
+        )
+    )
+    {%- endif %}
+{% endmacro %}
+
+{% macro create_index(columns, unique=false) %}
+    {%- set columns = [columns] if columns is string else columns -%}
+    CREATE {{ 'UNIQUE ' if unique }}INDEX IF NOT EXISTS {{ this.identifier }}__{{ columns | join('__') }}_idx
+    ON {{ this }} ({{ columns | join(', ') }})
+{% endmacro %}
+
+{% macro optional_column(relation, column, data_type='TEXT') %}
+    {%- set existing = adapter.get_columns_in_relation(relation) | map(attribute='name') | map('lower') | list if execute else [] -%}
+    {%- if column | lower in existing -%}
+    {{ column }}
+    {%- else -%}
+    CAST(NULL AS {{ data_type }}) AS {{ column }}
+    {%- endif -%}
+{% endmacro %}
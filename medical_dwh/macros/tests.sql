@@ -0,0 +1,14 @@
+{#
+    unique_combination_of_columns: generic test failing on any combination of
+    `combination_of_columns` that occurs more than once (e.g. a bridge's
+    (group_id, position) key).
+#}
+
+{% test unique_combination_of_columns(model, combination_of_columns) %}
+    SELECT
+        {{ combination_of_columns | join(', ') }},
+        COUNT(*) AS occurrences
+    FROM {{ model }}
+    GROUP BY {{ combination_of_columns | join(', ') }}
+    HAVING COUNT(*) > 1
+{% endtest %}
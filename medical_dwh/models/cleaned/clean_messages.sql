@@ -1,12 +1,27 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy=var('incremental_strategy', 'merge'),
+        post_hook=[
+            "{{ create_index('group_id', unique=true) }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
 WITH cleaned AS (
     SELECT 
-        message_id,
-        sender_id,
+        raw_id,
+        group_id,
+        message_ids,
+        sender AS sender_id,
         TRIM(message_text) AS message_text,
-        message_date,
-        COALESCE(media_path, 'No Media') AS media_path,
-        channel
-    FROM stg_telegram_messages
+        scraped_date,
+        COALESCE(media_paths, ARRAY[]::TEXT[]) AS media_paths,
+        links
+    FROM {{ ref('stg_telegram_messages') }}
     WHERE message_text IS NOT NULL
+    {{ incremental_window('raw_id', 'AND') }}
 )
-SELECT * FROM cleaned
\ No newline at end of file
+SELECT * FROM cleaned
@@ -1,11 +1,26 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy=var('incremental_strategy', 'merge'),
+        post_hook=[
+            "{{ create_index('group_id', unique=true) }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
 WITH filled AS (
     SELECT 
-        message_id,
-        COALESCE(sender_id, 'Unknown Sender') AS sender_id,
+        raw_id,
+        group_id,
+        message_ids,
+        COALESCE(sender_id::TEXT, 'Unknown Sender') AS sender_id,
         COALESCE(message_text, 'No Text') AS message_text,
-        message_date,
-        COALESCE(media_path, 'No Media') AS media_path,
-        channel
-    FROM deduplicated
+        scraped_date,
+        media_paths,
+        COALESCE(links, ARRAY[]::TEXT[]) AS links
+    FROM {{ ref('remove_duplicates') }}
+    {{ incremental_window('raw_id') }}
 )
 SELECT * FROM filled
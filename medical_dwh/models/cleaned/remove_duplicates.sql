@@ -1,7 +1,20 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy=var('incremental_strategy', 'merge'),
+        post_hook=[
+            "{{ create_index('group_id', unique=true) }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
 WITH deduplicated AS (
-    SELECT DISTINCT ON (message_id) 
-        message_id, sender_id, message_text, message_date, media_path, channel
-    FROM cleaned_messages
-    ORDER BY message_id, message_date DESC
+    SELECT DISTINCT ON (group_id) 
+        raw_id, group_id, message_ids, sender_id, message_text, scraped_date, media_paths, links
+    FROM {{ ref('clean_messages') }}
+    {{ incremental_window('raw_id') }}
+    ORDER BY group_id, raw_id DESC
 )
 SELECT * FROM deduplicated
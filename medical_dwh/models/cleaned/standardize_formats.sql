@@ -1,11 +1,27 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy=var('incremental_strategy', 'merge'),
+        post_hook=[
+            "{{ create_index('group_id', unique=true) }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
 WITH standardized AS (
     SELECT 
-        message_id,
+        raw_id,
+        group_id,
+        message_ids,
         sender_id,
         LOWER(TRIM(message_text)) AS message_text,
-        TO_TIMESTAMP(message_date, 'YYYY-MM-DD HH24:MI:SS') AS formatted_date,
-        media_path,
-        channel
-    FROM filled
+        DATE_TRUNC('second', scraped_date) AS formatted_date,
+        scraped_date,
+        media_paths,
+        links
+    FROM {{ ref('handle_missing') }}
+    {{ incremental_window('raw_id') }}
 )
 SELECT * FROM standardized
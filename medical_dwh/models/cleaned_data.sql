@@ -1,3 +1,7 @@
+-- Disabled: superseded by models/cleaned/*. It reads an unqualified `raw_data` table
+-- with per-message columns (message_id, link, business_name, ...) that the loader does not write.
+{{ config(enabled=false) }}
+
 WITH raw_data AS (
     SELECT 
         group_id,
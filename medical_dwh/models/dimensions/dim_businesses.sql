@@ -1,7 +1,26 @@
-SELECT
-    DISTINCT group_id,
-    business_name,
-    phone_number,
-    address
-FROM {{ ref('stg_telegram') }}
-WHERE business_name IS NOT NULL
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy=var('incremental_strategy', 'merge'),
+        post_hook=[
+            "{{ create_index('group_id', unique=true) }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
+-- Empty until raw_data carries business_name (see optional_column in staging)
+WITH businesses AS (
+    SELECT DISTINCT ON (group_id)
+        raw_id,
+        group_id,
+        business_name,
+        phone_number,
+        address
+    FROM {{ ref('stg_telegram_messages') }}
+    WHERE business_name IS NOT NULL
+    {{ incremental_window('raw_id', 'AND') }}
+    ORDER BY group_id, raw_id DESC
+)
+SELECT * FROM businesses
@@ -1,18 +1,28 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy=var('incremental_strategy', 'merge'),
+        post_hook=[
+            "{{ create_index('group_id', unique=true) }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
+-- One row per group (album or post). Messages, media and links live in the
+-- fact_messages, fact_media and fact_links bridges, joined on group_id.
 WITH cleaned_data AS (
     SELECT
+        raw_id,
         group_id,
-        message_ids,
         message_text,
-        media_paths,
-        links,
+        sender,
+        COALESCE(cardinality(message_ids), 0) AS message_count,
+        COALESCE(cardinality(media_paths), 0) AS media_count,
+        COALESCE(cardinality(links), 0) AS link_count,
         scraped_date
-    FROM {{ ref('stg_telegram') }}
+    FROM {{ ref('stg_telegram_messages') }}
+    {{ incremental_window('raw_id') }}
 )
-SELECT
-    group_id,
-    UNNEST(message_ids) AS message_id,
-    message_text,
-    UNNEST(media_paths) AS media_path,
-    UNNEST(links) AS extracted_link,
-    scraped_date
-FROM cleaned_data
+SELECT * FROM cleaned_data
@@ -0,0 +1,27 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy='delete+insert',
+        pre_hook="{{ replace_window_groups(ref('stg_telegram_messages')) }}",
+        post_hook=[
+            "{{ create_index(['group_id', 'link_position'], unique=true) }}",
+            "{{ create_index('extracted_link') }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
+-- Bridge: one row per element of links, keyed by (group_id, link_position).
+-- Several rows per group: the pre-hook clears every group in the window, including
+-- groups whose array is now empty and so produce no rows below.
+SELECT
+    stg.raw_id,
+    stg.group_id,
+    item.extracted_link,
+    item.link_position,
+    stg.scraped_date
+FROM {{ ref('stg_telegram_messages') }} AS stg
+CROSS JOIN LATERAL unnest(stg.links) WITH ORDINALITY AS item(extracted_link, link_position)
+WHERE item.extracted_link IS NOT NULL
+{{ incremental_window('raw_id', 'AND', source_column='stg.raw_id') }}
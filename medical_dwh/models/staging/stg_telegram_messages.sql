@@ -1,14 +1,37 @@
 -- Staging Model
+{{
+    config(
+        materialized='incremental',
+        unique_key='group_id',
+        incremental_strategy=var('incremental_strategy', 'merge'),
+        on_schema_change='append_new_columns',
+        post_hook=[
+            "{{ create_index('group_id', unique=true) }}",
+            "{{ create_index('raw_id') }}"
+        ]
+    )
+}}
+
+-- Columns as written by PostgresStorage (scripts/utils/storage_interface.py)
 WITH raw_data AS (
-    SELECT
-        _id AS raw_id,
+    -- One row per group so the merge never matches a key twice
+    SELECT DISTINCT ON (group_id)
+        id AS raw_id,
         group_id,
         message_ids,
-        message_text,
-        sender,
-        scraped_date,
-        media_paths,
-        ARRAY(SELECT unnest(regexp_matches(message_text, 'https?://[^\s]+', 'g'))) AS links
+        message AS message_text,
+        sender_id AS sender,
+        date AS scraped_date,
+        media_path AS media_paths,
+        -- The cleaning step strips URLs from `message` and stores them in `links`
+        COALESCE(links, ARRAY(SELECT unnest(regexp_matches(message, 'https?://[^\s]+', 'g')))) AS links,
+        loaded_at,
+        -- Business details for dim_businesses; NULL until the loader writes these columns
+        {{ optional_column(source('telegram', 'raw_data'), 'business_name') }},
+        {{ optional_column(source('telegram', 'raw_data'), 'phone_number') }},
+        {{ optional_column(source('telegram', 'raw_data'), 'address') }}
     FROM {{ source('telegram', 'raw_data') }}
+    {{ incremental_window('raw_id', source_column='id') }}
+    ORDER BY group_id, id DESC
 )
 SELECT * FROM raw_data
@@ -1,3 +1,7 @@
+-- Disabled: stg_telegram_messages is already one row per group, and ARRAY_AGG over
+-- the array columns fails when albums differ in size. Use models/cleaned and models/facts.
+{{ config(enabled=false) }}
+
 -- Transformation Model
 WITH grouped_messages AS (
     SELECT
@@ -8,7 +12,7 @@ WITH grouped_messages AS (
         MAX(scraped_date) AS scraped_date,
         ARRAY_AGG(DISTINCT media_paths) AS media_paths,
         ARRAY_AGG(DISTINCT links) AS links
-    FROM {{ ref('stg_telegram_data') }}
+    FROM {{ ref('stg_telegram_messages') }}
     GROUP BY group_id, sender
 )
 SELECT * FROM grouped_messages
\ No newline at end of file
@@ -1 +1 @@
-SELECT message_id FROM standardized WHERE message_id IS NULL;
+SELECT group_id, message_ids FROM {{ ref('standardize_formats') }} WHERE message_ids IS NULL
@@ -1 +1 @@
-SELECT sender_id FROM standardized WHERE sender_id = 'Unknown Sender';
+SELECT group_id, sender_id FROM {{ ref('standardize_formats') }} WHERE sender_id = 'Unknown Sender'
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Setup logger for benchmarks
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.benchmarks.synthetic import make_text
+
+logger = setup_logger("benchmark")
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'medical_dwh')
+DEFAULT_SELECT = "staging cleaned facts"
+
+# ==========================================
+# Synthetic Raw Data
+# ==========================================
+
+RAW_COLUMNS = ["group_id", "message_ids", "message", "date", "sender_id", "media_path", "links"]
+
+def make_raw_rows(rng: random.Random, start: datetime, hours: int, rows_per_hour: int, first_group_id: int) -> List[tuple]:
+    """
+    `RAW_COLUMNS` rows for `telegram.raw_data` covering `hours` hours from `start`.
+
+    Group ids keep increasing across calls so each hour only adds new groups,
+    like an hourly scrape of new posts.
+    """
+    rows = []
+    group_id = first_group_id
+    for hour in range(hours):
+        for _ in range(rows_per_hour):
+            date = start + timedelta(hours=hour, seconds=rng.randint(0, 3599))
+            size = rng.randint(2, 5) if rng.random() < 0.3 else 1
+            message_ids = [group_id * 10 + i for i in range(size)]
+            media_paths = [f"media/synthetic/{mid}.jpg" for mid in message_ids if rng.random() < 0.6]
+            sender_id = -1_000_000_000_000 - rng.randint(1, 50)
+            text = make_text(rng, "synthetic", group_id)
+            links = [word for word in text.split() if word.startswith("http")]
+            rows.append((group_id, message_ids, text, date, sender_id, media_paths, links))
+            group_id += 1
+    return rows
+
+async def prepare_source(dsn: str, schema: str) -> None:
+    """Recreate `<schema>.raw_data` with the same DDL the pipeline's PostgresStorage uses."""
+    from scripts.utils.storage_interface import PostgresStorage
+
+    storage = PostgresStorage(dsn, f"{schema}.raw_data")
+    storage.conn = await storage.connect()
+    try:
+        await storage.conn.execute(f'CREATE SCHEMA IF NOT EXISTS {schema}')
+        await storage.conn.execute(f'DROP TABLE IF EXISTS {schema}.raw_data')
+        await storage._create_table()
+    finally:
+        await storage.conn.close()
+
+async def append_rows(dsn: str, schema: str, rows: List[tuple]) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.copy_records_to_table("raw_data", schema_name=schema, records=rows, columns=RAW_COLUMNS)
+        await conn.execute(f'ANALYZE {schema}.raw_data')
+    finally:
+        await conn.close()
+
+# ==========================================
+# dbt Runs
+# ==========================================
+
+def run_dbt(args, full_refresh: bool) -> Dict[str, Any]:
+    """Run `dbt run` on the selected models and return wall time plus per-model timings."""
+    command = [
+        args.dbt, "run",
+        "--project-dir", args.project_dir,
+        "--select", *args.select.split(),
+        "--vars", json.dumps({"raw_schema": args.raw_schema, "incremental_strategy": args.strategy}),
+    ]
+    if args.profiles_dir:
+        command += ["--profiles-dir", args.profiles_dir]
+    if args.target:
+        command += ["--target", args.target]
+    if full_refresh:
+        command.append("--full-refresh")
+
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        logger.error(completed.stdout[-4000:] + completed.stderr[-2000:])
+        raise RuntimeError(f"dbt run failed with exit code {completed.returncode}")
+
+    with open(os.path.join(args.project_dir, "target", "run_results.json"), "r", encoding="utf-8") as f:
+        results = json.load(f)["results"]
+    return {
+        "seconds": round(elapsed, 3),
+        "models": {
+            result["unique_id"].split(".")[-1]: {
+                "seconds": round(result["execution_time"], 3),
+                "rows_affected": (result.get("adapter_response") or {}).get("rows_affected"),
+            }
+            for result in results
+        },
+    }
+
+# ==========================================
+# Runner
+# ==========================================
+
+async def main(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    start = datetime(2025, 1, 1)  # raw_data.date is naive UTC
+    report = {
+        "benchmark": "dbt_incremental",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "history_hours": args.history_hours, "rows_per_hour": args.rows_per_hour,
+            "hours": args.hours, "select": args.select, "strategy": args.strategy, "seed": args.seed,
+        },
+        "runs": [],
+    }
+
+    await prepare_source(args.dsn, args.raw_schema)
+    history = make_raw_rows(rng, start, args.history_hours, args.rows_per_hour, first_group_id=1)
+    await append_rows(args.dsn, args.raw_schema, history)
+    next_group_id = len(history) + 1
+    logger.info("Loaded %d rows of history; building models from scratch", len(history))
+    report["initial_build"] = run_dbt(args, full_refresh=True)
+
+    for hour in range(args.hours):
+        batch = make_raw_rows(rng, start + timedelta(hours=args.history_hours + hour), 1, args.rows_per_hour, next_group_id)
+        next_group_id += len(batch)
+        await append_rows(args.dsn, args.raw_schema, batch)
+
+        run = {"hour": hour + 1, "new_rows": len(batch), "incremental": run_dbt(args, full_refresh=False)}
+        if not args.skip_full_refresh:
+            # Same data rebuilt from scratch, i.e. what every hourly run cost before
+            run["full_refresh"] = run_dbt(args, full_refresh=True)
+            run["speedup"] = round(run["full_refresh"]["seconds"] / run["incremental"]["seconds"], 2)
+        report["runs"].append(run)
+        logger.info("Hour %d: incremental %.2fs%s", hour + 1, run["incremental"]["seconds"], f", full refresh {run['full_refresh']['seconds']:.2f}s" if "full_refresh" in run else "")
+
+    incremental = [run["incremental"]["seconds"] for run in report["runs"]]
+    report["summary"] = {"avg_incremental_seconds": round(sum(incremental) / len(incremental), 3) if incremental else None}
+    if not args.skip_full_refresh and report["runs"]:
+        full = [run["full_refresh"]["seconds"] for run in report["runs"]]
+        report["summary"]["avg_full_refresh_seconds"] = round(sum(full) / len(full), 3)
+        report["summary"]["avg_speedup"] = round(sum(full) / sum(incremental), 2)
+    return report
+
+def default_dsn() -> Optional[str]:
+    if os.getenv("BENCHMARK_POSTGRES_DSN"):
+        return os.getenv("BENCHMARK_POSTGRES_DSN")
+    if os.getenv("POSTGRES_DB_HOST"):
+        return "postgresql://{}:{}@{}:{}/{}".format(
+            os.getenv("POSTGRES_DB_USER"), os.getenv("POSTGRES_DB_PASSWORD"), os.getenv("POSTGRES_DB_HOST"),
+            os.getenv("POSTGRES_DB_PORT", "5432"), os.getenv("POSTGRES_DB_NAME"),
+        )
+    return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hourly incremental dbt runs against full rebuilds on synthetic raw_data.")
+    parser.add_argument("--dsn", default=default_dsn(), help="Postgres DSN of the dbt target database (BENCHMARK_POSTGRES_DSN)")
+    parser.add_argument("--raw-schema", default="benchmark_raw", help="Schema for the synthetic telegram.raw_data (dropped and recreated)")
+    parser.add_argument("--history-hours", type=int, default=24 * 30, help="Hours of history loaded before the first build")
+    parser.add_argument("--rows-per-hour", type=int, default=500)
+    parser.add_argument("--hours", type=int, default=3, help="Hourly increments to benchmark")
+    parser.add_argument("--select", default=DEFAULT_SELECT, help="dbt selection (space separated)")
+    parser.add_argument("--strategy", default="merge", choices=["merge", "delete+insert"])
+    parser.add_argument("--skip-full-refresh", action="store_true", help="Do not time a full rebuild after each increment")
+    parser.add_argument("--project-dir", default=PROJECT_DIR)
+    parser.add_argument("--profiles-dir", default=None)
+    parser.add_argument("--target", default=None)
+    parser.add_argument("--dbt", default="dbt", help="dbt executable")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("--dsn (or BENCHMARK_POSTGRES_DSN / POSTGRES_DB_*) is required")
+
+    report = asyncio.run(main(args))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
@@ -0,0 +1,327 @@
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import sqlite3
+import argparse
+import resource
+import tempfile
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Setup logger for benchmarks
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.utils import profiling
+from scripts.utils.records import as_rows
+from scripts.benchmarks.synthetic import make_dataset, FakeTelegramClient
+
+logger = setup_logger("benchmark")
+
+COCO8_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'datasets', 'coco8', 'images')
+
+# ==========================================
+# Stage Measurement
+# ==========================================
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+async def run_stage(report: Dict[str, Any], name: str, func, *args, **kwargs) -> Any:
+    """
+    Run one stage and record its wall time, throughput and peak traced memory.
+
+    `func` returns (result, records); records is the unit used for records_per_sec.
+    """
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        if asyncio.iscoroutine(result):
+            result = await result
+        result, records = result
+    except Exception as e:
+        logger.error(f"Stage {name} failed: {e}")
+        report["stages"][name] = {"error": f"{type(e).__name__}: {e}"}
+        return None
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+
+    report["stages"][name] = {
+        "seconds": round(elapsed, 4),
+        "records": records,
+        "records_per_sec": round(records / elapsed, 1) if elapsed else None,
+        "peak_traced_mb": round(peak / (1024 * 1024), 2),
+        "max_rss_mb": _max_rss_mb(),
+    }
+    return result
+
+def skip_stage(report: Dict[str, Any], name: str, reason: str) -> None:
+    logger.warning(f"Skipping stage {name}: {reason}")
+    report["stages"][name] = {"skipped": reason}
+
+# ==========================================
+# Local Stand-ins
+# ==========================================
+
+class SQLiteAsyncpgConnection:
+    """
+    The subset of an asyncpg connection PostgresStorage uses, backed by SQLite.
+
+    Translates `$n` placeholders, SERIAL and array column types, and stores lists as JSON,
+    so the storage code path runs unchanged without a Postgres server.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+
+    @staticmethod
+    def _sql(query: str) -> str:
+        query = re.sub(r"\$\d+", "?", query)
+        query = query.replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
+        return re.sub(r"\b(\w+)\[\]", "TEXT", query)
+
+    @staticmethod
+    def _param(value: Any) -> Any:
+        if isinstance(value, (list, tuple, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    async def execute(self, query: str, *args) -> None:
+        if "ADD COLUMN IF NOT EXISTS" in query:
+            return  # Postgres-only migration; fresh SQLite tables already have the columns
+        self.conn.execute(self._sql(query), [self._param(arg) for arg in args])
+
+    async def executemany(self, query: str, values) -> None:
+        self.conn.executemany(self._sql(query), ([self._param(v) for v in row] for row in values))
+
+    async def fetch(self, query: str, *args) -> List[sqlite3.Row]:
+        return self.conn.execute(self._sql(query), [self._param(arg) for arg in args]).fetchall()
+
+    def transaction(self):
+        conn = self.conn
+
+        class _Transaction:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, exc_type, exc, tb):
+                conn.rollback() if exc_type else conn.commit()
+
+        return _Transaction()
+
+    def close(self) -> None:
+        self.conn.close()
+
+def make_mongo_standin():
+    """MongoDBStorage on an in-memory mongomock_motor client."""
+    from mongomock_motor import AsyncMongoMockClient
+    from scripts.utils.storage_interface import MongoDBStorage
+
+    storage = MongoDBStorage.__new__(MongoDBStorage)
+    storage.client = AsyncMongoMockClient()
+    storage.db = storage.client["benchmark"]
+    storage.collection = storage.db["raw_data"]
+    storage.use_gridfs = False
+    storage.fs = None
+    return storage
+
+async def make_postgres_standin():
+    """PostgresStorage on an in-memory SQLite connection."""
+    from scripts.utils.storage_interface import PostgresStorage
+
+    storage = PostgresStorage("sqlite://:memory:", "raw_data")
+    storage.conn = SQLiteAsyncpgConnection()
+    await storage._create_table()
+    return storage
+
+def make_fake_api(client: FakeTelegramClient, semaphore_limit: int = 5):
+    """TelegramAPI with its telethon client replaced by the synthetic one."""
+    from scripts.utils.telegram_client import TelegramAPI
+
+    api = TelegramAPI.__new__(TelegramAPI)
+    api.semaphore = asyncio.Semaphore(semaphore_limit)
+    api.allowed_media = {"photo"}
+    api.client = client
+    return api
+
+# ==========================================
+# Stages
+# ==========================================
+
+def generate_stage(channels: int, messages: int, seed: int):
+    dataset = make_dataset(channels, messages, seed)
+    return dataset, sum(len(history) for history in dataset.values())
+
+async def scrape_stage(workdir: str, dataset, limit: int):
+    """Drive TelegramScraper.scrape_channels over the synthetic client into LocalStorage."""
+    from scripts.utils import scraper as scraper_module
+    from scripts.utils.storage_interface import LocalStorage
+
+    # Keep the run hermetic: no reads/writes of resources/configs/last_id.json
+    scraper_module.get_last_id = lambda channel, *args, **kwargs: 0
+    scraper_module.save_last_id = lambda channel, last_id, *args, **kwargs: None
+
+    storage = LocalStorage(os.path.join(workdir, "raw"), "json")
+    api = make_fake_api(FakeTelegramClient(dataset))
+    scraper = scraper_module.TelegramScraper(api, storage, os.path.join(workdir, "media"))
+    await scraper.scrape_channels(list(dataset), limit)
+
+    rows = []
+    for channel in dataset:
+        rows.extend(await storage.retrieve_data({}, channel))
+    return rows, sum(min(len(messages), limit) for messages in dataset.values())
+
+async def storage_stage(storage, rows):
+    await storage.save_data(rows)
+    retrieved = await storage.retrieve_data({})
+    return retrieved, len(rows) + len(retrieved)
+
+async def clean_stage(storage, use_arrow: bool):
+    from scripts.data_utils.cleaning_pipeline import TelegramDataCleaningPipeline
+
+    pipeline = TelegramDataCleaningPipeline(storage, use_arrow=use_arrow)
+    data = await pipeline.load_raw_data()
+    cleaned = pipeline.clean_dataframe(data)
+    return cleaned, len(cleaned)
+
+def detect_stage(model, image_paths, batched: bool, batch_size: int):
+    from scripts.modeling.yolo import get_detections, get_detections_batched
+
+    if batched:
+        detections = get_detections_batched(model, image_paths, batch_size=batch_size)
+    else:
+        detections = get_detections(model, image_paths)
+    return detections, len(detections)
+
+# ==========================================
+# Runner
+# ==========================================
+
+async def main(args) -> Dict[str, Any]:
+    report = {
+        "benchmark": "etl",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {"channels": args.channels, "messages": args.messages, "seed": args.seed},
+        "stages": {},
+    }
+    tracemalloc.start()
+
+    dataset = await run_stage(report, "generate", generate_stage, args.channels, args.messages, args.seed)
+    if dataset is None:
+        return report
+
+    with tempfile.TemporaryDirectory() as workdir:
+        rows = await run_stage(report, "scrape", scrape_stage, workdir, dataset, args.messages)
+        if not rows:
+            return report
+        rows = as_rows(rows)
+
+        # Storage backends
+        from scripts.utils.storage_interface import LocalStorage
+        for file_format in ("json", "csv", "parquet"):
+            try:
+                storage = LocalStorage(os.path.join(workdir, f"store_{file_format}"), file_format)
+            except ImportError as e:
+                skip_stage(report, f"storage.{file_format}", str(e))
+                continue
+            await run_stage(report, f"storage.{file_format}", storage_stage, storage, rows)
+
+        try:
+            mongo = make_mongo_standin()
+        except ImportError as e:
+            skip_stage(report, "storage.mongo", f"mongomock_motor not installed ({e})")
+        else:
+            await run_stage(report, "storage.mongo", storage_stage, mongo, [dict(row) for row in rows])
+
+        postgres = await make_postgres_standin()
+        await run_stage(report, "storage.postgres", storage_stage, postgres, rows)
+        postgres.conn.close()
+
+        # Cleaning over the JSON store written above
+        clean_source = LocalStorage(os.path.join(workdir, "store_json"), "json")
+        await run_stage(report, "clean", clean_stage, clean_source, False)
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            skip_stage(report, "clean.arrow", "pyarrow not installed")
+        else:
+            await run_stage(report, "clean.arrow", clean_stage, clean_source, True)
+
+    # Detection on coco8
+    if args.skip_detection:
+        skip_stage(report, "detect", "--skip-detection")
+    else:
+        from scripts.utils.file_utils import list_images
+
+        images = list(list_images(args.images)) if os.path.isdir(args.images) else []
+        if not images:
+            skip_stage(report, "detect", f"no images under {args.images}")
+        else:
+            try:
+                from scripts.modeling.yolo import get_model
+                model = get_model(args.model)
+                model(images[0], verbose=False)  # Warm up weights and kernels
+            except Exception as e:
+                skip_stage(report, "detect", f"model unavailable ({e})")
+            else:
+                image_paths = images * args.detect_repeat
+                await run_stage(report, "detect.sequential", detect_stage, model, image_paths, False, args.batch_size)
+                await run_stage(report, "detect.batched", detect_stage, model, image_paths, True, args.batch_size)
+
+    tracemalloc.stop()
+    return report
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List stages whose throughput fell more than `tolerance` below the baseline."""
+    regressions = []
+    for name, stage in report["stages"].items():
+        base = baseline.get("stages", {}).get(name, {})
+        current, previous = stage.get("records_per_sec"), base.get("records_per_sec")
+        if current and previous and current < previous * (1 - tolerance):
+            regressions.append(f"{name}: {current} records/sec vs baseline {previous} (-{100 * (1 - current / previous):.0f}%)")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end ETL benchmark on synthetic Telegram data with local stand-ins.")
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=500, help="Messages generated per channel")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--images", default=COCO8_IMAGES, help="Directory of images for the detection stage")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--detect-repeat", type=int, default=4, help="Cycle the image set this many times")
+    parser.add_argument("--skip-detection", action="store_true")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Previous JSON report to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed fractional throughput drop vs baseline")
+    parser.add_argument("--profile", action="store_true", help="Also write per-stage cProfile/tracemalloc reports to logs/profiles")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable()
+
+    report = asyncio.run(main(args))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    sys.exit(exit_code)
@@ -0,0 +1,110 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+# Setup logger for benchmarks
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.logger import setup_logger
+
+logger = setup_logger("benchmark")
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+APP_DIR = os.path.join(REPO_ROOT, 'deployment', 'app')
+
+# Modules that must not be pulled in by a cold import of the target
+FORBIDDEN_MODULES = ("tensorflow", "torch", "ultralytics", "cv2", "joblib", "sklearn")
+STORAGE_DRIVERS = ("motor", "pymongo", "bson", "gridfs", "asyncpg", "psycopg2", "pandas", "pyarrow")
+
+# Named checks: (module, import directory, forbidden top-level packages)
+SUITES = {
+    "app": [("main", APP_DIR, FORBIDDEN_MODULES)],
+    "scripts": [
+        ("scripts.utils.storage_interface", REPO_ROOT, STORAGE_DRIVERS),
+        ("scripts.utils.serialization", REPO_ROOT, STORAGE_DRIVERS),
+        ("scripts.utils.records", REPO_ROOT, STORAGE_DRIVERS),
+        ("scripts.data_utils.extract", REPO_ROOT, FORBIDDEN_MODULES + ("pandas",)),
+        ("scripts.utils.scraper", REPO_ROOT, FORBIDDEN_MODULES + ("pandas", "pyarrow")),
+        ("scripts.utils.monitor", REPO_ROOT, FORBIDDEN_MODULES + ("pandas", "pyarrow")),
+    ],
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+def measure(module: str, cwd: str):
+    """
+    Import `module` in a fresh interpreter under `-X importtime`.
+
+    Returns:
+        Tuple[int, List[Tuple[str, int, int]]]: Total cumulative microseconds of top-level
+        imports and (module, self_us, cumulative_us) for every imported module.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+
+    total, modules = 0, []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        modules.append((name, self_us, cumulative_us))
+        if len(indent) == 1:  # top-level import
+            total += cumulative_us
+    return total, modules
+
+def check(module: str, cwd: str, forbidden_modules, budget_ms: float, runs: int, top: int) -> dict:
+    """Measure one module and report whether it meets the budget."""
+    # Take the best of several runs to smooth out filesystem cache noise
+    measurements = [measure(module, cwd) for _ in range(runs)]
+    total, modules = min(measurements, key=lambda m: m[0])
+
+    loaded = {name for name, _, _ in modules}
+    forbidden = sorted({name.split(".")[0] for name in loaded} & set(forbidden_modules))
+    slowest = sorted(modules, key=lambda m: m[2], reverse=True)[:top]
+
+    report = {
+        "module": module,
+        "import_ms": round(total / 1000, 1),
+        "budget_ms": budget_ms,
+        "modules_loaded": len(loaded),
+        "forbidden_loaded": forbidden,
+        "slowest": [{"module": name, "cumulative_ms": round(cum / 1000, 1)} for name, _, cum in slowest],
+        "ok": total / 1000 <= budget_ms and not forbidden,
+    }
+    if not report["ok"]:
+        logger.error(f"Cold import of {module} took {report['import_ms']} ms (budget {budget_ms} ms); heavy modules loaded: {forbidden}")
+    return report
+
+def main(targets, budget_ms: float, runs: int, top: int) -> int:
+    reports = []
+    for module, cwd, forbidden_modules in targets:
+        try:
+            reports.append(check(module, cwd, forbidden_modules, budget_ms, runs, top))
+        except RuntimeError as e:
+            logger.error(str(e))
+            reports.append({"module": module, "ok": False, "error": str(e)})
+
+    print(json.dumps(reports, indent=2))
+    return 0 if all(report["ok"] for report in reports) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold import time with `python -X importtime` and enforce a budget.")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="app", help="Predefined set of modules to check")
+    parser.add_argument("--module", help="Check a single module instead of a suite")
+    parser.add_argument("--cwd", default=REPO_ROOT, help="Directory to import --module from")
+    parser.add_argument("--forbid", nargs="*", default=list(FORBIDDEN_MODULES), help="Packages --module must not import")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to report")
+    args = parser.parse_args()
+
+    targets = [(args.module, args.cwd, tuple(args.forbid))] if args.module else SUITES[args.suite]
+    sys.exit(main(targets, args.budget_ms, args.runs, args.top))
@@ -0,0 +1,67 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import httpx
+
+DEFAULT_PATHS = ["/scraped-data?limit=50", "/cleaned-data?limit=50", "/detected-objects?limit=50", "/cleaned-data-pg?limit=50"]
+
+async def worker(client, paths, deadline, latencies, errors):
+    """Issue requests round-robin over `paths` until the deadline."""
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - start)
+
+async def run(base_url, paths, concurrency, duration):
+    latencies, errors = [], {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await client.get("/")  # Warm up the connection pool
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(client, paths, deadline, latencies, errors) for _ in range(concurrency)))
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / duration, 1),
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p95_ms": round(quantiles[94] * 1000, 1),
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure API requests/sec. Run once against the sync build and once against the async build to compare."
+    )
+    parser.add_argument("--base-url", default="http://localhost:7777")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--output", default=None, help="Append the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.base_url, args.paths, args.concurrency, args.duration))
+    print(json.dumps(report, indent=4))
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+    sys.exit(1 if report["requests"] == 0 else 0)
+
+if __name__ == "__main__":
+    main()
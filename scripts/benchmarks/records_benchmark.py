@@ -0,0 +1,53 @@
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+
+# Make the repository root importable when run as a script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.records import TelegramMessage
+
+def make_row(i):
+    """A scraped group as the scraper used to build it: a dict with string keys."""
+    return {
+        "Group ID": 13_000_000_000 + i,
+        "Message IDs": [i, i + 1],
+        "Text": None,
+        "Message": "",
+        "Date": "2025-01-31T10:15:00+00:00",
+        "Sender ID": -1001234567890,
+        "Media Path": [],
+        "Channel": "ZemenExpress",
+    }
+
+def make_record(i):
+    return TelegramMessage.from_row(make_row(i))
+
+def measure(factory, count):
+    """Return the bytes allocated per record by `factory`, excluding shared constants."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    records = [factory(i) for i in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Discount the list holding the records so only per-record cost remains
+    return (after - before - sys.getsizeof(records)) / len(records)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per scraped-message record: dict vs TelegramMessage.")
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    dict_bytes = measure(make_row, args.records)
+    slots_bytes = measure(make_record, args.records)
+    print(json.dumps({
+        "records": args.records,
+        "dict_bytes_per_record": round(dict_bytes, 1),
+        "slots_bytes_per_record": round(slots_bytes, 1),
+        "reduction": f"{(1 - slots_bytes / dict_bytes):.0%}"
+    }, indent=4))
+
+if __name__ == "__main__":
+    main()
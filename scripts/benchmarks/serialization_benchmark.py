@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import aiofiles
+import pandas as pd
+from bson import ObjectId
+from datetime import datetime, timezone
+
+# Setup logger for benchmarks
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.utils.serialization import Serializer
+from scripts.data_utils.loaders import CustomJSONEncoder
+from scripts.utils.storage_interface import LocalStorage
+
+logger = setup_logger("benchmark")
+
+def make_records(count):
+    """Build scraped-message shaped records with the types the encoders must handle."""
+    now = datetime.now(timezone.utc)
+    return [{
+        "_id": ObjectId(),
+        "Group ID": 13_000_000_000 + i,
+        "Message IDs": [i, i + 1, i + 2],
+        "Text": "**ሰላም** Quality products 😀 https://t.me/example",
+        "Message": "ሰላም Quality products 😀 https://t.me/example " * 3,
+        "Date": pd.Timestamp(now),
+        "Scraped At": now,
+        "Sender ID": -1001234567890,
+        "Media Path": [f"../resources/media/channel/{i}.jpg"]
+    } for i in range(count)]
+
+async def legacy_save(records, file_path):
+    """The previous LocalStorage._save_json_streaming loop: stdlib encoder, one awaited write per item."""
+    async with aiofiles.open(file_path, "w", encoding="utf-8") as f:
+        await f.write("[\n")
+        for i, record in enumerate(records):
+            json_record = json.dumps(record, ensure_ascii=False, cls=CustomJSONEncoder)
+            if i > 0:
+                await f.write(",\n")
+            await f.write(json_record)
+        await f.write("\n]")
+
+async def buffered_save(records, storage_path):
+    storage = LocalStorage(storage_path, "json")
+    await storage.save_data(records)
+
+async def main(count, backends):
+    records = make_records(count)
+    report = {"records": count}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        await legacy_save(records, os.path.join(tmp, "legacy.json"))
+        report["legacy_records_per_sec"] = round(count / (time.perf_counter() - start))
+
+        for backend in backends:
+            try:
+                serializer = Serializer(backend)
+            except ImportError:
+                continue
+            start = time.perf_counter()
+            for record in records:
+                serializer.dumps_bytes(record)
+            report[f"{backend}_encode_records_per_sec"] = round(count / (time.perf_counter() - start))
+
+        start = time.perf_counter()
+        await buffered_save(records, tmp)
+        report["buffered_save_records_per_sec"] = round(count / (time.perf_counter() - start))
+
+    report["speedup"] = round(report["buffered_save_records_per_sec"] / report["legacy_records_per_sec"], 2)
+    print(json.dumps(report, indent=4))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare records/sec of the old and new JSON save paths.")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--backends", nargs="+", default=["json", "msgspec", "orjson"])
+    args = parser.parse_args()
+
+    asyncio.run(main(args.records, args.backends))
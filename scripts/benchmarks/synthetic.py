@@ -0,0 +1,123 @@
+import io
+import random
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Vocabulary mixing Amharic and English the way the scraped e-commerce channels do
+AMHARIC_WORDS = [
+    "ሰላም", "ዋጋ", "ብር", "አዲስ", "ምርት", "ጫማ", "ልብስ", "ስልክ", "ቦርሳ", "ጥራት",
+    "ቅናሽ", "ይደውሉ", "አድራሻ", "መገናኛ", "ቦሌ", "ፒያሳ", "ለሽያጭ", "ኦሪጅናል", "ያለን", "በጣም",
+]
+ENGLISH_WORDS = [
+    "price", "new", "original", "quality", "size", "delivery", "free", "order", "shoes",
+    "bag", "phone", "discount", "available", "stock", "call", "inbox", "brand", "sale",
+]
+EMOJIS = ["😀", "🔥", "✅", "📞", "💯", "👟", "👜", "📱", "🚚", "⭐", "🎁", "👉"]
+LINKS = ["https://t.me/{channel}", "www.example.et/p/{n}", "https://youtu.be/{n}"]
+
+class FakeMessage:
+    """Minimal stand-in for a telethon Message as used by the scraper."""
+
+    def __init__(self, id: int, grouped_id: Optional[int], message: str, date: datetime, sender_id: int, media=None, media_bytes: Optional[bytes] = None):
+        self.id = id
+        self.grouped_id = grouped_id
+        self.message = message
+        self.text = message
+        self.date = date
+        self.sender_id = sender_id
+        self.media = media
+        self._media_bytes = media_bytes
+
+    async def download_media(self, file_path: str) -> Optional[str]:
+        if self._media_bytes is None:
+            return None
+        with open(file_path, "wb") as f:
+            f.write(self._media_bytes)
+        return file_path
+
+class FakeTelegramClient:
+    """Replays generated channel histories through `iter_messages`."""
+
+    def __init__(self, channels: Dict[str, List[FakeMessage]]):
+        self.channels = channels
+
+    async def iter_messages(self, channel: str, limit: Optional[int] = None, min_id: int = 0, reverse: bool = False) -> AsyncIterator[FakeMessage]:
+        history = [message for message in self.channels.get(channel, []) if message.id > min_id]
+        if reverse:
+            history.reverse()  # Oldest first, as telethon does with reverse=True
+        for i, message in enumerate(history):
+            if limit is not None and i >= limit:
+                break
+            yield message
+
+def make_text(rng: random.Random, channel: str, n: int) -> str:
+    """A post mixing Amharic and English words, emojis, a price, a phone number and links."""
+    words = rng.choices(AMHARIC_WORDS, k=rng.randint(4, 14)) + rng.choices(ENGLISH_WORDS, k=rng.randint(2, 8))
+    rng.shuffle(words)
+    parts = [" ".join(words)]
+    parts.append("".join(rng.choices(EMOJIS, k=rng.randint(0, 4))))
+    parts.append(f"ዋጋ {rng.randint(100, 20_000)} ብር")
+    if rng.random() < 0.6:
+        parts.append(f"📞 09{rng.randint(10_000_000, 99_999_999)}")
+    for template in rng.sample(LINKS, k=rng.randint(0, 2)):
+        parts.append(template.format(channel=channel, n=n))
+    return "\n".join(part for part in parts if part)
+
+def make_image_bytes(rng: random.Random, size: int = 64) -> bytes:
+    """Small JPEG to stand in for downloaded media (random bytes if Pillow is missing)."""
+    if Image is None:
+        return rng.randbytes(size * size)
+    image = Image.new("RGB", (size, size), tuple(rng.randint(0, 255) for _ in range(3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=70)
+    return buffer.getvalue()
+
+def make_photo_media():
+    """A MessageMediaPhoto instance so TelegramAPI.download_media accepts the message."""
+    from telethon.tl.types import MessageMediaPhoto
+
+    try:
+        return MessageMediaPhoto()
+    except TypeError:
+        return MessageMediaPhoto(photo=None)
+
+def make_channel(rng: random.Random, channel: str, messages: int, album_rate: float = 0.3, media_rate: float = 0.5, media=None, image_bytes: Optional[bytes] = None, first_id: int = 1) -> List[FakeMessage]:
+    """
+    Generate a channel history, newest first like `iter_messages`.
+
+    Albums are 2-5 photos sharing a grouped_id where only the first carries the caption.
+    Message ids start at `first_id` so ids stay unique across channels.
+    """
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    sender_id = -1_000_000_000_000 - rng.randint(1, 999_999)
+    history = []
+    message_id = first_id
+    while len(history) < messages:
+        date = start + timedelta(minutes=(message_id - first_id) * 7)
+        text = make_text(rng, channel, message_id)
+        if rng.random() < album_rate:
+            grouped_id = 13_000_000_000_000 + message_id
+            for j in range(min(rng.randint(2, 5), messages - len(history))):
+                history.append(FakeMessage(message_id, grouped_id, text if j == 0 else "", date, sender_id, media, image_bytes))
+                message_id += 1
+        else:
+            has_media = rng.random() < media_rate
+            history.append(FakeMessage(message_id, None, text, date, sender_id, media if has_media else None, image_bytes if has_media else None))
+            message_id += 1
+    history.reverse()
+    return history
+
+def make_dataset(channels: int = 4, messages: int = 500, seed: int = 0, album_rate: float = 0.3, media_rate: float = 0.5) -> Dict[str, List[FakeMessage]]:
+    """Generate `channels` synthetic channel histories of `messages` messages each."""
+    rng = random.Random(seed)
+    media = make_photo_media()
+    image_bytes = make_image_bytes(rng)
+    return {
+        f"synthetic_channel_{i}": make_channel(rng, f"synthetic_channel_{i}", messages, album_rate, media_rate, media, image_bytes, first_id=i * 10_000_000 + 1)
+        for i in range(channels)
+    }
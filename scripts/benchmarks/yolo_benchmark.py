@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import time
+import argparse
+from itertools import islice, cycle
+
+# Setup logger for benchmarks
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.modeling.yolo import get_model, get_detections, iter_detections, list_images
+
+logger = setup_logger("benchmark")
+
+COCO8_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'datasets', 'coco8', 'images')
+
+def time_run(func, image_paths):
+    """Run a detection callable and return (images/sec, seconds)."""
+    start = time.perf_counter()
+    count = func(image_paths)
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else float("inf"), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-image and batched YOLO throughput.")
+    parser.add_argument("--images", default=COCO8_IMAGES, help="Directory of images (defaults to datasets/coco8/images)")
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLO weights to load")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=8, help="Cycle the image set to this many times its size")
+    args = parser.parse_args()
+
+    images = list(list_images(args.images))
+    if not images:
+        logger.error(f"No images found in {args.images}. Fetch coco8 with ultralytics first.")
+        sys.exit(1)
+    image_paths = list(islice(cycle(images), len(images) * args.repeat))
+
+    model = get_model(args.model)
+    model(images[0], verbose=False)  # Warm up weights and kernels
+
+    baseline, baseline_s = time_run(lambda paths: len(get_detections(model, paths)), image_paths)
+    batched, batched_s = time_run(
+        lambda paths: sum(1 for _ in iter_detections(model, paths, batch_size=args.batch_size, num_workers=args.workers)),
+        image_paths
+    )
+
+    report = {
+        "images": len(image_paths),
+        "batch_size": args.batch_size,
+        "per_image": {"images_per_sec": round(baseline, 2), "seconds": round(baseline_s, 3)},
+        "batched": {"images_per_sec": round(batched, 2), "seconds": round(batched_s, 3)},
+        "speedup": round(batched / baseline, 2) if baseline else None
+    }
+    print(json.dumps(report, indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 import os
 import sys
 import pandas as pd
+from itertools import islice
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
 # Setup logger for cleaning operations
 sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
 from scripts.utils.logger import setup_logger
 from scripts.data_utils.cleaner import *
 from scripts.utils.storage_interface import StorageInterface
+from scripts.utils.records import TelegramMessage, MESSAGE_COLUMNS
+from scripts.utils.metrics import timed, record_items
+from scripts.utils.profiling import profiled
 
 logger = setup_logger("data_cleaning")
 
@@ -14,21 +23,83 @@ logger = setup_logger("data_cleaning")
 # Data Cleaning Pipeline
 # ==========================================
 
+ARROW_BATCH_SIZE = 50_000
+
+def message_arrow_schema() -> 'pa.Schema':
+    """Arrow schema for raw scraped messages, in `MESSAGE_COLUMNS` order."""
+    return pa.schema([
+        ("Group ID", pa.int64()),
+        ("Message IDs", pa.list_(pa.int64())),
+        ("Text", pa.string()),
+        ("Message", pa.string()),
+        ("Date", pa.string()),
+        ("Sender ID", pa.int64()),
+        ("Media Path", pa.list_(pa.string())),
+        ("Channel", pa.string()),
+    ])
+
+def arrow_types_mapper(arrow_type: 'pa.DataType'):
+    """Map Arrow strings to `string[pyarrow]` and every other type to `pd.ArrowDtype`."""
+    if arrow_type == pa.string():
+        return pd.StringDtype("pyarrow")
+    return pd.ArrowDtype(arrow_type)
+
+def missing_media_as_empty(media_path):
+    """Return [] for a missing (None/NaN) media path and the value unchanged otherwise."""
+    if hasattr(media_path, "__len__"):  # list, str, ndarray
+        return media_path
+    return [] if pd.isna(media_path) else media_path
+
 class TelegramDataCleaningPipeline:
-    def __init__(self, storage):
+    def __init__(self, storage, use_arrow: bool = False):
         """
         Initialize the cleaning pipeline with a storage backend.
 
         Args:
             storage: The storage backend for saving cleaned data.
+            use_arrow (bool): Build and clean an Arrow-backed frame (`string[pyarrow]` text,
+                list<int64>/list<string> list columns) and hand an Arrow table to storage
+                backends that support it. Requires pyarrow.
         """
+        if use_arrow and pa is None:
+            raise ImportError("use_arrow=True requires pyarrow to be installed")
         self.storage = storage
+        self.use_arrow = use_arrow
+
+    @staticmethod
+    def _as_records(raw_data):
+        """Normalize dict rows (with key drift) or TelegramMessage records to records."""
+        return (row if isinstance(row, TelegramMessage) else TelegramMessage.from_row(row) for row in raw_data)
+
+    def _build_arrow_frame(self, raw_data) -> pd.DataFrame:
+        """Convert raw rows to an Arrow-backed DataFrame through record batches."""
+        schema = message_arrow_schema()
+        rows = (dict(zip(MESSAGE_COLUMNS, record.to_tuple())) for record in self._as_records(raw_data))
+
+        batches = []
+        while chunk := list(islice(rows, ARROW_BATCH_SIZE)):
+            batches.append(pa.RecordBatch.from_pylist(chunk, schema=schema))
+
+        table = pa.Table.from_batches(batches, schema=schema)
+        return table.to_pandas(types_mapper=arrow_types_mapper)
+
+    def build_frame(self, raw_data) -> pd.DataFrame:
+        """Build the raw message frame from dict rows or TelegramMessage records."""
+        if self.use_arrow:
+            try:
+                return self._build_arrow_frame(raw_data)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                logger.warning(f"Raw data does not fit the Arrow schema ({e}); falling back to object columns.")
+
+        # Normalize key drift ("channel" vs "Channel", ...) into the canonical columns
+        records = (record.to_tuple() for record in self._as_records(raw_data))
+        return pd.DataFrame.from_records(records, columns=MESSAGE_COLUMNS)
 
     async def load_raw_data(self) -> pd.DataFrame:
         """Load raw data from the storage backend."""
         try:
             raw_data = await self.storage.retrieve_data({})  # Fetch all data
-            data = pd.DataFrame(raw_data)
+            data = self.build_frame(raw_data)
             logger.info(f"Loaded {len(data)} raw Telegram messages from storage.")
             return data
         except Exception as e:
@@ -52,6 +123,7 @@ class TelegramDataCleaningPipeline:
 
         return text
 
+    @timed("clean_dataframe")
     def clean_dataframe(self, data: pd.DataFrame) -> pd.DataFrame:
         """Clean and standardize the entire dataframe."""
         try:
@@ -71,21 +143,37 @@ class TelegramDataCleaningPipeline:
             #     "Media Path": "media_path"
             # })
 
+            # Handle missing values first: the extractors cannot take pd.NA (Arrow) or NaN (object).
+            arrow_backed = isinstance(data['Message'].dtype, (pd.StringDtype, pd.ArrowDtype))
+            data['Message'] = data['Message'].fillna("No Message")
+            if not isinstance(data['Media Path'].dtype, pd.ArrowDtype):
+                # Frames passed to run() from elsewhere (preprocess_data, elt.transform) may hold NaN;
+                # use [] like TelegramMessage so every frame stores missing media the same way
+                data['Media Path'] = data['Media Path'].apply(missing_media_as_empty)
+            data['Date'] = pd.to_datetime(data['Date'], errors='coerce').fillna(pd.Timestamp.now())
+
             # Extract additional features
             data['Emojis'] = data['Message'].apply(extract_emojis)
             data['Links'] = data['Message'].apply(extract_links)
-            data['Message'] = data['Message'].apply(remove_urls)
-
-            # Handle missing values
-            data['Message'] = data['Message'].fillna("No Message")
-            data['Media Path'] = data['Media Path'].fillna("No Media")
-            data['Date'] = pd.to_datetime(data['Date'], errors='coerce').fillna(pd.Timestamp.now())
+            if arrow_backed:
+                data['Message'] = data['Message'].str.replace(r'http\S+|www\S+', '', regex=True)  # remove_urls on Arrow strings
+            else:
+                data['Message'] = data['Message'].apply(remove_urls)
 
             # Clean text columns
             data['Message'] = data['Message'].apply(self.clean_text_pipeline)
             data['Channel'] = data['Channel'].str.strip()
 
+            if arrow_backed:
+                # `apply` returns object columns; cast them back so the frame stays Arrow-backed
+                data = data.astype({
+                    'Emojis': pd.StringDtype("pyarrow"),
+                    'Message': pd.StringDtype("pyarrow"),
+                    'Links': pd.ArrowDtype(pa.list_(pa.string())),
+                })
+
             logger.info("Data cleaning completed successfully.")
+            record_items("clean_dataframe", len(data))
 
             return data
         
@@ -93,6 +181,7 @@ class TelegramDataCleaningPipeline:
             logger.error(f"Error cleaning dataframe: {e}")
             raise
 
+    @profiled("clean")
     async def run(self, data=None):
         """Run the entire cleaning pipeline."""
         try:
@@ -107,7 +196,10 @@ class TelegramDataCleaningPipeline:
             cleaned_data = self.clean_dataframe(data)
 
             # Save cleaned data
-            await self.storage.save_data(cleaned_data.to_dict('records'))
+            if self.use_arrow and hasattr(self.storage, "save_table"):
+                await self.storage.save_table(pa.Table.from_pandas(cleaned_data, preserve_index=False))
+            else:
+                await self.storage.save_data(cleaned_data.to_dict('records'))
             logger.info("Cleaned data saved successfully.")
 
             return cleaned_data
@@ -1,31 +1,144 @@
 import os
 import sys
-from PIL import Image
+from PIL import Image, ImageOps
 import pytesseract
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple, Dict, Any
 
 # Setup logger for data_loader
 sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
 from scripts.utils.logger import setup_logger
-from scripts.data_utils.loaders import load_json
+from scripts.utils.file_utils import list_images
+from scripts.utils.result_cache import ResultCache, hash_file
 
 logger = setup_logger("extract")
 
 CONFIG_PATH = os.path.join('..', 'resources', 'configs')
 config_file = os.path.join(CONFIG_PATH, 'config.json')
 
-config = load_json(config_file)
+DEFAULT_LANG = 'amh'
+_tesseract_configured = False
 
-TESSERACT_PATH = config['TESSERACT_PATH']
+def configure_tesseract(config_path: str = config_file) -> None:
+    """Point pytesseract at the configured binary. Runs once, on first OCR call."""
+    global _tesseract_configured
+    if _tesseract_configured:
+        return
 
-# Set Tesseract path
-pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
+    tesseract_path = os.getenv("TESSERACT_PATH")
+    if not tesseract_path and os.path.exists(config_path):
+        from scripts.data_utils.loaders import load_json
 
-def extract_text_from_image(image_path):
+        tesseract_path = load_json(config_path).get('TESSERACT_PATH')
+
+    # Set Tesseract path (falls back to `tesseract` on PATH)
+    if tesseract_path:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    _tesseract_configured = True
+
+def preprocess_image(image: Image.Image, grayscale: bool = False, max_side: Optional[int] = None, binarize: bool = False, threshold: int = 128) -> Image.Image:
+    """
+    Shrink an image before OCR to cut tesseract time.
+
+    Args:
+        image (Image.Image): Source image.
+        grayscale (bool): Convert to single-channel luminance.
+        max_side (Optional[int]): Downscale so the longest side is at most this many pixels.
+        binarize (bool): Apply a fixed threshold after grayscale conversion.
+        threshold (int): Threshold used when binarizing.
+
+    Returns:
+        Image.Image: Preprocessed image.
+    """
+    if max_side and max(image.size) > max_side:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if grayscale or binarize:
+        image = ImageOps.grayscale(image)
+    if binarize:
+        image = image.point(lambda value: 255 if value > threshold else 0, mode='1')
+    return image
+
+def _ocr(image_path: str, lang: str, preprocess: Optional[Dict[str, Any]]) -> str:
+    """Run tesseract on a single image file."""
+    with Image.open(image_path) as image:
+        if preprocess:
+            image = preprocess_image(image, **preprocess)
+        return pytesseract.image_to_string(image, lang=lang)
+
+def extract_text_from_image(image_path, lang: str = DEFAULT_LANG, preprocess: Optional[Dict[str, Any]] = None):
+    configure_tesseract()
     try:
-        image = Image.open(image_path)
-        text = pytesseract.image_to_string(image, lang='amh')
+        text = _ocr(image_path, lang, preprocess)
         logger.info(f"Extracted text from image: {image_path}")
         return text
     except Exception as e:
         logger.error(f"Failed to extract text from image: {image_path}. Error: {e}")
         return None
+
+def get_ocr_cache(lang: str = DEFAULT_LANG, preprocess: Optional[Dict[str, Any]] = None, db_path: Optional[str] = None, max_entries: int = 100_000) -> ResultCache:
+    """Open the persistent OCR cache for a language and preprocessing setting."""
+    configure_tesseract()
+    namespace = ResultCache.make_namespace(
+        task="ocr",
+        lang=lang,
+        tesseract=str(pytesseract.get_tesseract_version()),
+        preprocess=preprocess or {}
+    )
+    return ResultCache(db_path, namespace=namespace, max_entries=max_entries)
+
+def _extract_cached(image_path: str, lang: str, preprocess: Optional[Dict[str, Any]], cache: Optional[ResultCache]) -> Optional[str]:
+    """OCR one image, consulting the cache first (runs inside the worker pool)."""
+    try:
+        content_hash = hash_file(image_path) if cache is not None else None
+        if content_hash:
+            cached = cache.get(content_hash)
+            if cached is not None:
+                return cached
+
+        text = _ocr(image_path, lang, preprocess)
+        if content_hash:
+            cache.set(content_hash, text)
+        return text
+    except Exception as e:
+        logger.error(f"Failed to extract text from image: {image_path}. Error: {e}")
+        return None
+
+def extract_texts_from_images(image_paths: Iterable[str], max_workers: Optional[int] = None, lang: str = DEFAULT_LANG, preprocess: Optional[Dict[str, Any]] = None, cache: Optional[ResultCache] = None) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    OCR many images concurrently and stream the results in input order.
+
+    Every tesseract call is its own subprocess, so a thread pool is enough to keep
+    all cores busy. At most `2 * max_workers` images are in flight at once, which
+    keeps memory bounded for arbitrarily long inputs. Without `preprocess` the text
+    is identical to `extract_text_from_image`.
+
+    Args:
+        image_paths (Iterable[str]): Image paths; may be a lazy generator.
+        max_workers (Optional[int]): Concurrent tesseract processes. Defaults to the CPU count.
+        lang (str): Tesseract language.
+        preprocess (Optional[Dict[str, Any]]): Keyword arguments for `preprocess_image`.
+        cache (Optional[ResultCache]): OCR cache (see `get_ocr_cache`).
+
+    Yields:
+        Tuple[str, Optional[str]]: (image_path, text) pairs; text is None on failure.
+    """
+    configure_tesseract()
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr") as executor:
+        in_flight = deque()
+        for image_path in image_paths:
+            in_flight.append((image_path, executor.submit(_extract_cached, image_path, lang, preprocess, cache)))
+            if len(in_flight) >= 2 * max_workers:
+                path, future = in_flight.popleft()
+                yield path, future.result()
+
+        while in_flight:
+            path, future = in_flight.popleft()
+            yield path, future.result()
+
+def extract_text_from_directory(media_dir: str, **kwargs) -> Iterator[Tuple[str, Optional[str]]]:
+    """Stream OCR results for every image under a media directory."""
+    yield from extract_texts_from_images(list_images(media_dir), **kwargs)
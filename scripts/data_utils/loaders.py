@@ -1,12 +1,17 @@
 import os
+import sys
 import csv
+import mmap
 import yaml
 import json
-import joblib
 import pandas as pd
-from bson import ObjectId
-from typing import List, Dict, Union, Any
+from itertools import islice
+from functools import wraps
+from typing import List, Dict, Union, Optional, Any, Iterator
+sys.path.append("..")
+sys.path.append("../..")
 from scripts.utils.logger import setup_logger
+from scripts.utils import serialization
 
 # Setup logger for data_loader
 logger = setup_logger("data_loader")
@@ -15,25 +20,10 @@ class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, pd.Timestamp):
             return obj.isoformat()
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        return super().default(obj)
-
-import os
-import csv
-import yaml
-import json
-import joblib
-import pandas as pd
-from typing import List, Dict, Union, Optional, Any
-from functools import wraps
-import sys
-sys.path.append("..")
-sys.path.append("../..")
-from scripts.utils.logger import setup_logger
-
-# Setup logger for data_loader
-logger = setup_logger("data_loader")
+        try:
+            return serialization.default(obj)
+        except TypeError:
+            return super().default(obj)
 
 # Configuration (can be loaded from a YAML file)
 CONFIG = {
@@ -113,6 +103,90 @@ def load_json(file_path: str, use_pandas: bool = False) -> Union[List[Dict], Dic
         return pd.DataFrame(data)
     return data
 
+@handle_file_operations
+def load_jsonl(file_path: str, use_pandas: bool = False) -> Union[List[Dict], pd.DataFrame]:
+    """
+    Load a JSON Lines file into a list of records or a pandas DataFrame.
+
+    Args:
+        file_path (str): Path to the JSONL file.
+        use_pandas (bool, optional): Whether to use pandas. Defaults to False.
+
+    Returns:
+        Union[List[Dict], pd.DataFrame]: Loaded data.
+    """
+    if use_pandas:
+        return pd.read_json(file_path, lines=True)
+    return list(iter_jsonl(file_path))
+
+def iter_json_array(file_path: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Incrementally parse a JSON array file, yielding one element at a time.
+
+    Only the element being decoded (plus one read chunk) is held in memory, so
+    arbitrarily large exports can be streamed. A file whose top-level value is
+    not an array is decoded whole and yielded as a single item.
+
+    Args:
+        file_path (str): Path to the JSON file.
+        chunk_size (int, optional): Characters read per refill. Defaults to 64K.
+
+    Yields:
+        Any: Decoded array elements.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(file_path, mode='r', encoding='utf-8') as file:
+        buffer, pos, eof = '', 0, False
+
+        def refill() -> bool:
+            nonlocal buffer, pos, eof
+            chunk = file.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip(chars: str) -> None:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or not refill():
+                    return
+
+        skip(' \t\r\n')
+        if pos >= len(buffer):
+            return
+        if buffer[pos] != '[':
+            while refill():
+                pass
+            yield json.loads(buffer[pos:])
+            return
+        pos += 1
+
+        while True:
+            skip(' \t\r\n,')
+            if pos >= len(buffer):
+                raise ValueError(f"Unterminated JSON array in {file_path}")
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # A value cut at the chunk edge (e.g. "15" of "150.5") may still decode; make
+                # sure the element is followed by a separator before accepting it
+                rest = buffer[end:].lstrip()
+                if not eof and (not rest or rest[0] not in ',]') and refill():
+                    continue
+            except json.JSONDecodeError:
+                if not eof and refill():
+                    continue
+                raise
+            pos = end
+            yield item
+
 @handle_file_operations
 def load_pickle(file_path: str) -> Any:
     """
@@ -124,6 +198,8 @@ def load_pickle(file_path: str) -> Any:
     Returns:
         Any: Loaded data.
     """
+    import joblib
+
     return joblib.load(file_path)
 
 @handle_file_operations
@@ -181,6 +257,99 @@ def load_conll(file_path: str, columns: Optional[List[str]] = None, use_pandas:
         return pd.DataFrame(data)
     return data
 
+# ==========================================
+# Lazy Loaders
+# ==========================================
+
+def iter_lines(file_path: str, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Yield the lines of a file (line endings kept) by scanning a read-only memory map.
+
+    Pages are faulted in by the OS as the scan advances, so resident memory stays
+    small even for multi-gigabyte files.
+    """
+    if os.path.getsize(file_path) == 0:
+        return
+    with open(file_path, mode='rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start, size = 0, len(mm)
+        while start < size:
+            end = mm.find(b"\n", start)
+            end = size if end == -1 else end + 1
+            yield mm[start:end].decode(encoding)
+            start = end
+
+def iter_jsonl(file_path: str) -> Iterator[Any]:
+    """Yield one decoded record per non-empty line of a JSON Lines file."""
+    for line in iter_lines(file_path):
+        if line.strip():
+            yield serialization.loads(line)
+
+def iter_csv(file_path: str, delimiter: str = ',') -> Iterator[Dict[str, str]]:
+    """Yield CSV rows as dictionaries; quoted fields spanning lines are handled by the csv module."""
+    # utf-8-sig drops a leading byte order mark, which only the first line can carry
+    yield from csv.DictReader(iter_lines(file_path, encoding='utf-8-sig'), delimiter=delimiter)
+
+def iter_conll(file_path: str, columns: Optional[List[str]] = None) -> Iterator[Dict[str, List[str]]]:
+    """Yield one {tokens, labels} sentence at a time from a CoNLL file."""
+    if columns is None:
+        columns = CONFIG["conll"]["columns"]
+    tokens_column, labels_column = columns
+    tokens, labels = [], []
+
+    for line in iter_lines(file_path):
+        line = line.strip()
+        if line:
+            token, label = line.split("\t")
+            tokens.append(token)
+            labels.append(label)
+        elif tokens and labels:
+            yield {tokens_column: tokens, labels_column: labels}
+            tokens, labels = [], []
+    if tokens and labels:
+        yield {tokens_column: tokens, labels_column: labels}
+
+def _iter_frames(records: Iterator[Dict], chunksize: int, dtype: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+    """Group records into DataFrames of `chunksize` rows with the given dtypes."""
+    while chunk := list(islice(records, chunksize)):
+        frame = pd.DataFrame(chunk)
+        yield frame.astype({k: v for k, v in dtype.items() if k in frame.columns}) if dtype else frame
+
+def load_lazy(file_path: str, use_pandas: bool = False, chunksize: int = 100_000, dtype: Optional[Dict[str, Any]] = None, **kwargs) -> Iterator[Union[Dict, pd.DataFrame]]:
+    """
+    Lazily load a JSON, JSONL, CSV or CoNLL file.
+
+    Args:
+        file_path (str): Path to the file.
+        use_pandas (bool, optional): Yield DataFrame chunks instead of records. Defaults to False.
+        chunksize (int, optional): Rows per DataFrame chunk. Defaults to 100,000.
+        dtype (Optional[Dict[str, Any]], optional): Column dtypes applied to every chunk
+            (e.g. {"Group ID": "int64", "Channel": "category"}).
+        **kwargs: Format specific options (delimiter, columns).
+
+    Returns:
+        Iterator[Union[Dict, pd.DataFrame]]: Records, or DataFrame chunks when `use_pandas`.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if use_pandas and ext == ".csv":
+        return pd.read_csv(file_path, delimiter=kwargs.get("delimiter", ','), chunksize=chunksize, dtype=dtype)
+    if use_pandas and ext == ".jsonl":
+        return pd.read_json(file_path, lines=True, chunksize=chunksize, dtype=dtype)
+
+    ITERATORS = {
+        ".json": lambda: iter_json_array(file_path),
+        ".jsonl": lambda: iter_jsonl(file_path),
+        ".csv": lambda: iter_csv(file_path, delimiter=kwargs.get("delimiter", ',')),
+        ".conll": lambda: iter_conll(file_path, columns=kwargs.get("columns")),
+    }
+    if ext not in ITERATORS:
+        logger.error(f"Unsupported lazy file format: {ext}")
+        raise ValueError(f"Unsupported lazy file format: {ext}")
+
+    records = ITERATORS[ext]()
+    if use_pandas:
+        return _iter_frames(records, chunksize, dtype)
+    return records
+
 def save_csv(data: Union[List[Dict[str, str]], pd.DataFrame], output_path: str, delimiter: str = ',', use_pandas: bool = True) -> None:
     """
     Save data to a CSV file.
@@ -253,7 +422,7 @@ def save_json(data: Union[List[Dict], Dict, pd.DataFrame], output_path: str, use
             pd.DataFrame(data).to_json(output_path, orient="records", lines=True, force_ascii=False)
     else:
         with open(output_path, mode='w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=4, cls=CustomJSONEncoder)
+            file.write(serialization.dumps(data, indent=4))
     logger.info(f"Data saved to {output_path}")
 
 def save_pickle(data: Any, output_path: str) -> None:
@@ -264,6 +433,8 @@ def save_pickle(data: Any, output_path: str) -> None:
         data (Any): Data to save.
         output_path (str): Path to save the pickle file.
     """
+    import joblib
+
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     joblib.dump(data, output_path)
     logger.info(f"Data saved to {output_path}")
@@ -292,23 +463,33 @@ def save_conll(data: Union[List[Dict[str, List[str]]], pd.DataFrame], output_pat
             file.write("\n")
     logger.info(f"Data saved to {output_path}")
 
-def load_data(file_path: str, use_pandas: bool = True, **kwargs) -> Union[List[Dict], Dict, pd.DataFrame]:
+def load_data(file_path: str, use_pandas: bool = True, lazy: bool = False, **kwargs) -> Union[List[Dict], Dict, pd.DataFrame, Iterator]:
     """
-    Load data from a JSON, CSV, Excel, CoNLL, or pickle file.
+    Load data from a JSON, JSONL, CSV, Excel, CoNLL, or pickle file.
 
     Args:
         file_path (str): Path to the file.
         use_pandas (bool, optional): Whether to use pandas. Defaults to True.
+        lazy (bool, optional): Return an iterator of records (or DataFrame chunks when
+            `use_pandas`) instead of reading the whole file. See `load_lazy`. Defaults to False.
 
     Returns:
-        Union[List[Dict], Dict, pd.DataFrame]: Loaded data.
+        Union[List[Dict], Dict, pd.DataFrame, Iterator]: Loaded data.
 
     Raises:
         ValueError: If the file format is unsupported.
     """
-    ext = os.path.splitext(file_path)[1].lower()    
+    ext = os.path.splitext(file_path)[1].lower()
+    if lazy:
+        if not os.path.exists(file_path):
+            logger.error(f"File not found: {file_path}")
+            raise FileNotFoundError(f"File not found: {file_path}")
+        logger.info(f"Lazily loading data from {file_path}")
+        return load_lazy(file_path, use_pandas=use_pandas, **kwargs)
+
     LOADERS = {
         ".json": load_json,
+        ".jsonl": load_jsonl,
         ".csv": load_csv,
         ".xlsx": load_excel,
         ".pkl": load_pickle,
@@ -0,0 +1,458 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+# Setup logger for the pipeline runner
+sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.utils import profiling
+from scripts.utils.records import TelegramMessage, as_rows
+from scripts.utils.metrics import REGISTRY, track, record_items
+from scripts.utils.file_utils import IMAGE_EXTENSIONS
+from scripts.utils.storage_interface import StorageInterface, LocalStorage
+
+logger = setup_logger("pipeline")
+
+# ==========================================
+# Configuration
+# ==========================================
+
+STAGES = ("scrape", "store", "clean", "detect", "load")
+
+CONFIG_PATH = os.path.join('..', 'resources', 'configs')
+CHECKPOINT_FILE = os.path.join(CONFIG_PATH, 'pipeline_checkpoint.json')
+CHANNELS_FILE = os.path.join(CONFIG_PATH, 'channels.json')
+
+DEFAULT_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "200"))
+DEFAULT_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+DEFAULT_MODEL = os.getenv("YOLO_MODEL", "yolo11n.pt")
+CLEANED_COLLECTION = "cleaned_data"
+
+QUEUE_DEPTH = REGISTRY.gauge("etl_pipeline_queue_depth", "Batches waiting in front of a pipeline stage.")
+
+_DONE = object()  # End-of-stream marker passed down every queue
+
+# ==========================================
+# Checkpoints
+# ==========================================
+
+class PipelineCheckpoint:
+    """
+    Pipeline progress persisted as JSON.
+
+    `channels` maps each channel to the highest message id that went through every
+    enabled stage, so the next run only scrapes newer messages. `stages` keeps
+    per-stage batch and record counters with the time of the last batch.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_FILE):
+        self.path = path
+        self.state = self._read()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            logger.warning("No pipeline checkpoint at %s. Starting from scratch.", self.path)
+            state = {}
+        except json.JSONDecodeError:
+            logger.error("Error decoding pipeline checkpoint %s. Starting from scratch.", self.path)
+            state = {}
+        state.setdefault("channels", {})
+        state.setdefault("stages", {})
+        return state
+
+    def last_id(self, channel: str) -> int:
+        return self.state["channels"].get(channel, 0)
+
+    def advance(self, channel: str, last_id: int) -> None:
+        """Move a channel's watermark forward (never backward)."""
+        if last_id > self.last_id(channel):
+            self.state["channels"][channel] = last_id
+
+    def record(self, stage: str, records: int) -> None:
+        entry = self.state["stages"].setdefault(stage, {"batches": 0, "records": 0})
+        entry["batches"] += 1
+        entry["records"] += records
+        entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+    def save(self) -> None:
+        """Write the checkpoint atomically so a crash never leaves a truncated file."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+# ==========================================
+# Pipeline Runner
+# ==========================================
+
+class Batch:
+    """A chunk of one channel's messages moving through the stages."""
+
+    __slots__ = ("seq", "channel", "messages", "frame", "pending")
+
+    def __init__(self, seq: int, channel: str, messages: List[TelegramMessage], pending: int):
+        self.seq = seq
+        self.channel = channel
+        self.messages = messages
+        self.frame = None
+        self.pending = pending  # Terminal stages still to finish this batch
+
+    def media_paths(self) -> List[str]:
+        return [
+            path for message in self.messages for path in (message.media_path or [])
+            if isinstance(path, str) and path.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+
+class PipelineRunner:
+    """
+    Streams scrape → store → clean → detect → load in one pass.
+
+    Each stage is a single task reading from a bounded queue, so stages overlap
+    (channel B is scraped while channel A is cleaned and loaded) and a slow stage
+    applies backpressure instead of letting batches pile up in memory. Detection
+    branches off after `store` and runs alongside clean/load.
+
+    A channel's checkpoint only advances once all of its batches have finished every
+    enabled stage; a channel that fails is scraped again from its old checkpoint on
+    the next run, so writes must tolerate replays (Mongo upserts, Postgres skips
+    existing group ids).
+    """
+
+    def __init__(self, scraper, raw_storage: StorageInterface, load_storage: Optional[StorageInterface] = None, checkpoint: Optional[PipelineCheckpoint] = None, detector=None, cleaner=None, batch_size: int = DEFAULT_BATCH_SIZE, queue_size: int = DEFAULT_QUEUE_SIZE, stages: Iterable[str] = STAGES):
+        """
+        Initialize the runner.
+
+        Args:
+            scraper (TelegramScraper): Scraper used to fetch messages and download media.
+            raw_storage (StorageInterface): Receives the raw scraped messages.
+            load_storage (Optional[StorageInterface]): Receives the cleaned rows. Required for "load".
+            checkpoint (Optional[PipelineCheckpoint]): Progress store. Defaults to `CHECKPOINT_FILE`.
+            detector (Optional[DetectionStage]): Runs and persists detections. Required for "detect".
+            cleaner (Optional[TelegramDataCleaningPipeline]): Defaults to an object-column pipeline.
+            batch_size (int): Grouped messages per batch.
+            queue_size (int): Batches buffered in front of each stage.
+            stages (Iterable[str]): Stages to run; "scrape" and "store" always run.
+        """
+        stages = set(stages) | {"scrape", "store"}
+        unknown = stages - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}")
+        if "load" in stages and "clean" not in stages:
+            raise ValueError("The load stage needs the clean stage")
+        if "load" in stages and load_storage is None:
+            raise ValueError("The load stage needs a load storage")
+        if "detect" in stages and detector is None:
+            raise ValueError("The detect stage needs a detector")
+
+        if "clean" in stages and cleaner is None:
+            from scripts.data_utils.cleaning_pipeline import TelegramDataCleaningPipeline
+            cleaner = TelegramDataCleaningPipeline(load_storage)
+
+        self.scraper = scraper
+        self.raw_storage = raw_storage
+        self.load_storage = load_storage
+        self.checkpoint = checkpoint or PipelineCheckpoint()
+        self.detector = detector
+        self.cleaner = cleaner
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.stages = tuple(stage for stage in STAGES if stage in stages)
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+
+        self.downstream = {
+            "scrape": ["store"],
+            "store": [stage for stage in ("clean", "detect") if stage in stages],
+            "clean": ["load"] if "load" in stages else [],
+            "detect": [],
+            "load": [],
+        }
+        self.terminal = [stage for stage in self.stages if not self.downstream[stage]]
+        self.stats = {stage: {"batches": 0, "records": 0, "seconds": 0.0} for stage in self.stages}
+
+        self._seq = 0
+        self._outstanding: Dict[str, int] = {}  # channel -> batches not yet through every terminal stage
+        self._scraped: Dict[str, int] = {}  # channel -> highest scraped id, until committed
+
+    # ------------------------------------------
+    # Stage handlers (return the records handled)
+    # ------------------------------------------
+
+    async def _store(self, batch: Batch) -> int:
+        if isinstance(self.raw_storage, LocalStorage):
+            # LocalStorage overwrites its file, so every batch gets its own
+            await self.raw_storage.save_data(batch.messages, f"{batch.channel}-{self.run_id}-{batch.seq:05d}")
+        elif hasattr(self.raw_storage, "upsert_data"):
+            await self.raw_storage.upsert_data(as_rows(batch.messages), key="Group ID")
+        else:
+            await self.raw_storage.save_data(batch.messages)
+        return len(batch.messages)
+
+    async def _clean(self, batch: Batch) -> int:
+        def clean():
+            return self.cleaner.clean_dataframe(self.cleaner.build_frame(batch.messages))
+
+        # pandas work runs off the event loop so scraping and I/O keep going
+        batch.frame = await asyncio.to_thread(clean)
+        return len(batch.frame)
+
+    async def _detect(self, batch: Batch) -> int:
+        image_paths = batch.media_paths()
+        if not image_paths:
+            return 0
+        return await self.detector.process_batch(image_paths)
+
+    async def _load(self, batch: Batch) -> int:
+        rows = batch.frame.to_dict('records')
+        batch.frame = None
+        if isinstance(self.load_storage, LocalStorage):
+            await self.load_storage.save_data(rows, f"cleaned-{batch.channel}-{self.run_id}-{batch.seq:05d}")
+        elif hasattr(self.load_storage, "upsert_data"):
+            await self.load_storage.upsert_data(rows, key="Group ID", collection_name=CLEANED_COLLECTION)
+        else:
+            await self.load_storage.save_data(rows)
+        return len(rows)
+
+    # ------------------------------------------
+    # Plumbing
+    # ------------------------------------------
+
+    async def _put(self, queues: Dict[str, asyncio.Queue], stages: List[str], item) -> None:
+        for stage in stages:
+            await queues[stage].put(item)
+            QUEUE_DEPTH.set(queues[stage].qsize(), stage=stage)
+
+    def _finish(self, batch: Batch) -> None:
+        """Count one terminal stage as done for `batch` and commit its channel when complete."""
+        batch.pending -= 1
+        if batch.pending == 0:
+            self._outstanding[batch.channel] -= 1
+            self._commit(batch.channel)
+
+    def _commit(self, channel: str) -> None:
+        if channel in self._scraped and not self._outstanding.get(channel):
+            self.checkpoint.advance(channel, self._scraped.pop(channel))
+            self.checkpoint.save()
+
+    def _account(self, stage: str, records: int, elapsed: float) -> None:
+        stats = self.stats[stage]
+        stats["batches"] += 1
+        stats["records"] += records
+        stats["seconds"] += elapsed
+        record_items(f"pipeline.{stage}", records)
+        self.checkpoint.record(stage, records)
+
+    async def _scrape(self, channels: List[str], limit: int, queues: Dict[str, asyncio.Queue]) -> None:
+        outputs = self.downstream["scrape"]
+        for channel in channels:
+            min_id = self.checkpoint.last_id(channel)
+            start = time.perf_counter()
+            try:
+                with track("pipeline.scrape"):
+                    messages, _ = await self.scraper.collect_channel(channel, limit, min_id=min_id)
+            except Exception as e:
+                # Leave the checkpoint alone so the next run retries this channel
+                logger.error(f"Error scraping {channel}: {e}")
+                seconds = getattr(e, "seconds", None)  # FloodWaitError
+                if seconds:
+                    await asyncio.sleep(seconds)
+                continue
+            self._account("scrape", len(messages), time.perf_counter() - start)
+            logger.info("Scraped %d new messages from %s (after id %s)", len(messages), channel, min_id)
+
+            batches = []
+            for i in range(0, len(messages), self.batch_size):
+                self._seq += 1
+                batches.append(Batch(self._seq, channel, messages[i:i + self.batch_size], len(self.terminal)))
+
+            self._outstanding[channel] = len(batches)
+            # Messages come oldest first from the watermark, so everything up to this id is fetched
+            self._scraped[channel] = max((mid for message in messages for mid in message.message_ids), default=0)
+            for batch in batches:
+                await self._put(queues, outputs, batch)
+            self._commit(channel)  # Channels with nothing new commit right away
+
+        await self._put(queues, outputs, _DONE)
+
+    async def _consume(self, stage: str, queues: Dict[str, asyncio.Queue]) -> None:
+        handler = getattr(self, f"_{stage}")
+        inbox, outputs = queues[stage], self.downstream[stage]
+        while True:
+            batch = await inbox.get()
+            QUEUE_DEPTH.set(inbox.qsize(), stage=stage)
+            if batch is _DONE:
+                await self._put(queues, outputs, _DONE)
+                return
+
+            start = time.perf_counter()
+            with track(f"pipeline.{stage}"):
+                records = await handler(batch)
+            self._account(stage, records, time.perf_counter() - start)
+
+            await self._put(queues, outputs, batch)
+            if not outputs:
+                self._finish(batch)
+
+    @profiling.profiled("pipeline")
+    async def run(self, channels: List[str], limit: int = 1000) -> Dict[str, Any]:
+        """
+        Run every enabled stage over `channels` in one pipelined pass.
+
+        Args:
+            channels (List[str]): Channel usernames to scrape.
+            limit (int): Maximum new messages fetched per channel.
+
+        Returns:
+            Dict[str, Any]: Per-stage batches, records and busy seconds, plus the wall time.
+        """
+        start = time.perf_counter()
+        channels = list(dict.fromkeys(channels))  # Each channel is scraped (and checkpointed) once
+        queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in self.stages if stage != "scrape"}
+        tasks = [asyncio.create_task(self._scrape(channels, limit, queues), name="pipeline-scrape")]
+        tasks += [asyncio.create_task(self._consume(stage, queues), name=f"pipeline-{stage}") for stage in queues]
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # One failed stage stops the pass; completed channels are already checkpointed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self.checkpoint.save()
+
+        summary = {
+            "run_id": self.run_id,
+            "channels": len(channels),
+            "seconds": round(time.perf_counter() - start, 3),
+            "stages": {stage: {**stats, "seconds": round(stats["seconds"], 3)} for stage, stats in self.stats.items()},
+        }
+        logger.info("Pipeline run %s finished: %s", self.run_id, summary["stages"])
+        return summary
+
+# ==========================================
+# Entry Points
+# ==========================================
+
+def load_channels(channels_file: str = CHANNELS_FILE) -> List[str]:
+    from scripts.data_utils.loaders import load_json
+    return load_json(channels_file).get('channels', [])
+
+async def run_pipeline(channels: List[str], raw_storage_type: str = "json", load_storage_type: str = "postgres", stages: Iterable[str] = STAGES, limit: int = 1000, media_dir: Optional[str] = None, checkpoint_path: str = CHECKPOINT_FILE, batch_size: int = DEFAULT_BATCH_SIZE, queue_size: int = DEFAULT_QUEUE_SIZE, model_name: str = DEFAULT_MODEL, allowed_media: Iterable[str] = ("photo",), detect_workers: int = 0) -> Dict[str, Any]:
+    """
+    Build the Telegram client, storages and detector from the environment and run the pipeline.
+
+    Args:
+        channels (List[str]): Channel usernames to scrape.
+        raw_storage_type (str): Storage for raw messages (mongo, postgres, json, csv, parquet).
+        load_storage_type (str): Storage for cleaned rows; postgres feeds the dbt `raw_data` source.
+        stages (Iterable[str]): Stages to run (see `STAGES`).
+        limit (int): Maximum new messages fetched per channel.
+        media_dir (Optional[str]): Where media is downloaded. Defaults to the scraper's MEDIA_DIR.
+        checkpoint_path (str): Pipeline checkpoint file.
+        batch_size (int): Grouped messages per batch.
+        queue_size (int): Batches buffered in front of each stage.
+        model_name (str): YOLO weights used by the detect stage.
+        allowed_media (Iterable[str]): Media types to download.
+        detect_workers (int): Run detection in this many worker processes (0 = in-process).
+
+    Returns:
+        Dict[str, Any]: The run summary from `PipelineRunner.run`.
+    """
+    from dotenv import load_dotenv
+    from scripts.utils.telegram_client import TelegramAPI
+    from scripts.utils.scraper import TelegramScraper, SESSION_FILE, MEDIA_DIR, ensure_data_dirs
+
+    load_dotenv()
+    stages = set(stages)
+    media_dir = media_dir or MEDIA_DIR
+    ensure_data_dirs(media_dir)
+
+    raw_storage = await StorageInterface.create_storage(raw_storage_type)
+    load_storage = await StorageInterface.create_storage(load_storage_type) if "load" in stages else None
+    detect_storage, detector, cache, pool = None, None, None, None
+    if "detect" in stages:
+        from scripts.modeling.yolo import get_model, get_detection_cache
+        from scripts.modeling.detection_stage import DetectionStage
+        from scripts.modeling.worker_pool import DetectionWorkerPool
+
+        detect_storage = await StorageInterface.create_storage("mongo")
+        model = None
+        if detect_workers > 0:
+            pool = DetectionWorkerPool(model_name, num_workers=detect_workers)
+        else:
+            model = get_model(model_name)
+            cache = get_detection_cache(model)
+        detector = DetectionStage(model, detect_storage, cache=cache, pool=pool)
+        await detector.ensure_indexes()
+
+    api = TelegramAPI(
+        api_id=os.getenv("API_ID"),
+        api_hash=os.getenv("API_HASH"),
+        phone_number=os.getenv("PHONE_NUMBER"),
+        semaphore_limit=int(os.getenv("TELEGRAM_SCRAPER_SEMAPHORE", '5')),
+        allowed_media=list(allowed_media),
+        session_file=SESSION_FILE
+    )
+
+    try:
+        await api.authenticate()
+        runner = PipelineRunner(
+            TelegramScraper(api, raw_storage, media_dir), raw_storage, load_storage,
+            checkpoint=PipelineCheckpoint(checkpoint_path), detector=detector,
+            batch_size=batch_size, queue_size=queue_size, stages=stages
+        )
+        return await runner.run(channels, limit)
+    finally:
+        await api.cleanup()
+        await api.close()
+        for storage in (raw_storage, load_storage, detect_storage):
+            if storage is not None:
+                await storage.close()
+        if cache is not None:
+            cache.close()
+        if pool is not None:
+            pool.close()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape, store, clean, detect and load Telegram channels in one pipelined pass.")
+    parser.add_argument("--channels", nargs="*", help="Channel usernames (defaults to the channels file)")
+    parser.add_argument("--channels-file", default=CHANNELS_FILE)
+    parser.add_argument("--raw-storage", default="json", choices=["mongo", "postgres", "json", "csv", "parquet"])
+    parser.add_argument("--load-storage", default="postgres", choices=["mongo", "postgres", "json", "csv", "parquet"])
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--limit", type=int, default=1000, help="Maximum new messages per channel")
+    parser.add_argument("--media-dir", default=None)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--detect-workers", type=int, default=0, help="Detection worker processes (0 = in-process)")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile/tracemalloc reports to logs/profiles")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    setup_logger("pipeline", use_queue=True)  # The runner is async: write logs from a background thread
+    if args.profile:
+        profiling.enable()
+
+    channels = args.channels or load_channels(args.channels_file)
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    return asyncio.run(run_pipeline(
+        channels, args.raw_storage, args.load_storage, stages, args.limit, args.media_dir,
+        args.checkpoint, args.batch_size, args.queue_size, args.model,
+        detect_workers=args.detect_workers
+    ))
+
+if __name__ == "__main__":
+    print(json.dumps(main(), indent=2))
@@ -2,24 +2,34 @@ import os
 import sys
 import csv
 import json
+import queue
+import heapq
+import threading
 import asyncio
 import aiofiles
+import tempfile
+from datetime import datetime, timezone
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 # Setup logger for data_loader
 sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
 from scripts.utils.logger import setup_logger
+from scripts.data_utils.loaders import iter_json_array
+from scripts.utils.serialization import get_serializer, WRITE_BUFFER_SIZE
 from scripts.utils.storage_interface import StorageInterface
 from scripts.data_utils.cleaning_pipeline import TelegramDataCleaningPipeline
 
 logger = setup_logger("preprocess")
 
+MERGED_NAME = "Messages"
+
 # ==========================================
 # Main Data Preprocessing Function
 # ==========================================
 
-async def preprocess_data(data: pd.DataFrame, storage_type: str = "postgres") -> pd.DataFrame:
+async def preprocess_data(data: pd.DataFrame, storage_type: str = "postgres", use_arrow: bool = False) -> pd.DataFrame:
     """
     Loads, preprocesses, and saves cleaned data.
     """
@@ -27,20 +37,27 @@ async def preprocess_data(data: pd.DataFrame, storage_type: str = "postgres") ->
     storage = await StorageInterface.create_storage(storage_type)
 
     # Initialize and run the cleaning pipeline
-    pipeline = TelegramDataCleaningPipeline(storage)
+    pipeline = TelegramDataCleaningPipeline(storage, use_arrow=use_arrow)
     
     cleaned_data = await pipeline.run(data)
 
     return cleaned_data
 
-async def merge_files(data_path: str):
-    """Merge JSON and CSV data from all channels into a single file."""
+async def merge_files(data_path: str, stream: bool = False, order_by_date: bool = False, **stream_kwargs):
+    """
+    Merge JSON and CSV data from all channels into a single file.
+
+    With `stream=True` records are written as they are parsed, using bounded memory
+    (see `merge_files_streaming`); otherwise everything is loaded before writing.
+    """
+    if stream or order_by_date:
+        return await asyncio.to_thread(merge_files_streaming, data_path, order_by_date=order_by_date, **stream_kwargs)
         
     async def load_json_data(file_path: str, channel: str) -> List[Dict[str, Any]]:
         """Load data from a JSON file and add channel name."""
         try:
-            async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                data = json.loads(await f.read())
+            async with aiofiles.open(file_path, "rb") as f:
+                data = get_serializer().loads(await f.read())
                 for record in data:
                     record["Channel"] = channel  # Add channel name
                 return data
@@ -64,19 +81,21 @@ async def merge_files(data_path: str):
     for file in os.listdir(data_path):
         file_path = os.path.join(data_path, file)
         channel_name, ext = os.path.splitext(file)
+        if channel_name == MERGED_NAME:
+            continue  # Skip the output of a previous merge
 
         if ext == ".json":
             all_data.extend(await load_json_data(file_path, channel_name))
         elif ext == ".csv":
             all_data.extend(load_csv_data(file_path, channel_name))  # Synchronous function call
 
-    data_path_json = os.path.join(data_path, "Messages.json")
-    data_path_csv = os.path.join(data_path, "Messages.csv")
+    data_path_json = os.path.join(data_path, f"{MERGED_NAME}.json")
+    data_path_csv = os.path.join(data_path, f"{MERGED_NAME}.csv")
 
     # Save merged JSON
     try:
         async with aiofiles.open(data_path_json, "w", encoding="utf-8") as f:
-            await f.write(json.dumps(all_data, indent=4, ensure_ascii=False))
+            await f.write(get_serializer().dumps(all_data, indent=4))
         logger.info(f"Merged JSON saved to {data_path_json}")
     except Exception as e:
         logger.error(f"Error saving JSON file: {e}")
@@ -84,15 +103,174 @@ async def merge_files(data_path: str):
     # Save merged CSV
     if all_data:
         try:
-            fieldnames = list(all_data[0].keys())  # Get headers from the first record
+            fieldnames = list(dict.fromkeys(key for record in all_data for key in record))  # Union of all record keys
             with open(data_path_csv, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
                 writer.writeheader()
                 writer.writerows(all_data)
             logger.info(f"Merged CSV saved to {data_path_csv}")
         except Exception as e:
             logger.error(f"Error saving CSV file: {e}")
 
+
+# ==========================================
+# Streaming Merge
+# ==========================================
+
+_END_OF_FILE = object()
+
+def _iter_channel_file(file_path: str, channel: str) -> Iterator[Dict[str, Any]]:
+    """Incrementally parse one channel file, tagging each record with its channel."""
+    if file_path.endswith(".json"):
+        for record in iter_json_array(file_path):
+            record["Channel"] = channel
+            yield record
+    else:
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            for record in csv.DictReader(f):
+                record["Channel"] = channel
+                yield record
+
+def _iter_records_concurrently(files: List[str], data_path: str, max_workers: int, queue_size: int) -> Iterator[Dict[str, Any]]:
+    """Parse channel files in parallel threads, yielding records through a bounded queue."""
+    records = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def produce(file: str) -> None:
+        channel = os.path.splitext(file)[0]
+        file_path = os.path.join(data_path, file)
+        try:
+            for record in _iter_channel_file(file_path, channel):
+                if stop.is_set():
+                    return
+                records.put(record)
+        except Exception as e:
+            logger.error(f"Error loading {file_path}: {e}")
+        finally:
+            records.put(_END_OF_FILE)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="merge-reader") as executor:
+        for file in files:
+            executor.submit(produce, file)
+
+        remaining = len(files)
+        try:
+            while remaining:
+                record = records.get()
+                if record is _END_OF_FILE:
+                    remaining -= 1
+                else:
+                    yield record
+        finally:
+            # Unblock readers still waiting on a full queue if the consumer stopped early
+            stop.set()
+            while remaining:
+                if records.get() is _END_OF_FILE:
+                    remaining -= 1
+
+def _date_key(record: Dict[str, Any]) -> str:
+    """
+    Sort key: the "Date" as a canonical naive-UTC ISO string.
+
+    CSV and JSON exports format dates differently (" " or "T" separator, with or
+    without an offset), so raw strings do not compare chronologically. Records
+    without a date sort first; unparseable values keep their raw text.
+    """
+    value = record.get("Date")
+    if not value:
+        return ""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep="T", timespec="microseconds")
+    return str(value)
+
+def _write_run(records: List[Dict[str, Any]], run_dir: str, index: int, reverse: bool) -> str:
+    """Sort one in-memory run by date and spill it to a temporary JSONL file."""
+    records.sort(key=_date_key, reverse=reverse)
+    run_path = os.path.join(run_dir, f"run_{index:05d}.jsonl")
+    serializer = get_serializer()
+    with open(run_path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for record in records:
+            f.write(serializer.dumps_bytes(record) + b"\n")
+    return run_path
+
+def _iter_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+    serializer = get_serializer()
+    with open(file_path, "rb") as f:
+        for line in f:
+            yield serializer.loads(line)
+
+def _external_sort(records: Iterator[Dict[str, Any]], run_dir: str, run_size: int, reverse: bool) -> Iterator[Dict[str, Any]]:
+    """Order records by date with an external k-way merge over sorted runs."""
+    run_paths, run = [], []
+    for record in records:
+        run.append(record)
+        if len(run) >= run_size:
+            run_paths.append(_write_run(run, run_dir, len(run_paths), reverse))
+            run = []
+    if run:
+        run_paths.append(_write_run(run, run_dir, len(run_paths), reverse))
+
+    logger.info(f"Merging {len(run_paths)} sorted runs by date.")
+    yield from heapq.merge(*(_iter_jsonl(path) for path in run_paths), key=_date_key, reverse=reverse)
+
+def merge_files_streaming(data_path: str, order_by_date: bool = False, reverse: bool = False, write_csv: bool = True, max_workers: int = 4, queue_size: int = 10_000, run_size: int = 50_000) -> Dict[str, Any]:
+    """
+    Merge all channel files with memory bounded independently of input size.
+
+    Channel files are parsed incrementally and concurrently; records are written to
+    `Messages.jsonl` as they arrive while the union of all keys is collected. The CSV
+    is then produced from the JSONL in a second streaming pass with that union
+    header, so records with extra keys no longer break `DictWriter`.
+
+    Args:
+        data_path (str): Directory of per-channel `.json`/`.csv` files.
+        order_by_date (bool): Order output by "Date" through an external k-way merge.
+        reverse (bool): Newest first when ordering by date.
+        write_csv (bool): Also write `Messages.csv`.
+        max_workers (int): Concurrent file readers.
+        queue_size (int): Records buffered between readers and the writer.
+        run_size (int): Records per sorted run when ordering by date.
+
+    Returns:
+        Dict[str, Any]: Output paths, record count and CSV fieldnames.
+    """
+    files = sorted(
+        file for file in os.listdir(data_path)
+        if os.path.splitext(file)[1] in (".json", ".csv") and os.path.splitext(file)[0] != MERGED_NAME
+    )
+    data_path_jsonl = os.path.join(data_path, f"{MERGED_NAME}.jsonl")
+    data_path_csv = os.path.join(data_path, f"{MERGED_NAME}.csv")
+
+    serializer = get_serializer()
+    fieldnames, count = {}, 0
+    with tempfile.TemporaryDirectory(prefix="merge_runs_") as run_dir:
+        records = _iter_records_concurrently(files, data_path, max_workers, queue_size)
+        if order_by_date:
+            records = _external_sort(records, run_dir, run_size, reverse)
+
+        with open(data_path_jsonl, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            for record in records:
+                fieldnames.update(dict.fromkeys(record))
+                f.write(serializer.dumps_bytes(record) + b"\n")
+                count += 1
+    logger.info(f"Merged {count} records from {len(files)} files into {data_path_jsonl}")
+
+    if write_csv and count:
+        with open(data_path_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(fieldnames), restval="")
+            writer.writeheader()
+            writer.writerows(_iter_jsonl(data_path_jsonl))
+        logger.info(f"Merged CSV saved to {data_path_csv}")
+
+    return {"jsonl": data_path_jsonl, "csv": data_path_csv if write_csv and count else None, "records": count, "fieldnames": list(fieldnames)}
+
 if __name__ == "__main__":
     data_path = "../resources/data/raw"
     asyncio.run(merge_files(data_path))
\ No newline at end of file
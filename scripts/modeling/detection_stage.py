@@ -0,0 +1,191 @@
+import os
+import sys
+import asyncio
+import argparse
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Set
+
+# Setup logger for the detection stage
+sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.utils import profiling
+from scripts.utils.result_cache import ResultCache
+from scripts.utils.storage_interface import StorageInterface, MongoDBStorage
+from scripts.modeling.yolo import get_model, get_detections_batched, get_detection_cache, list_images, DEFAULT_BATCH_SIZE
+from scripts.modeling.worker_pool import DetectionWorkerPool
+
+logger = setup_logger("detection_stage")
+
+DETECTED_COLLECTION = "detected_objects"
+PATH_COLUMN = "Media Path"
+UNDECODABLE = "undecodable"  # `error` of detection documents for files that exist but could not be decoded
+
+class DetectionStage:
+    """
+    Incremental object-detection stage that persists results to `detected_objects`.
+
+    Each run only processes media that has no stored detections yet. Results are
+    upserted batch by batch, so an interrupted run resumes where it stopped.
+    Images that exist but cannot be decoded are stored with `error` set and no
+    detections, so they are not retried on every run; missing files are skipped
+    and picked up by a later run.
+    """
+
+    def __init__(self, model, storage: MongoDBStorage, collection_name: str = DETECTED_COLLECTION, path_column: str = PATH_COLUMN, batch_size: int = DEFAULT_BATCH_SIZE, manifest_path: Optional[str] = None, cache: Optional[ResultCache] = None, pool: Optional[DetectionWorkerPool] = None):
+        """
+        Initialize the detection stage.
+
+        Args:
+            model: A loaded YOLO model. Unused (and may be None) when `pool` is given.
+            storage (MongoDBStorage): Storage holding the scraped messages and the detections collection.
+            collection_name (str): Collection that receives detection documents.
+            path_column (str): Message field listing media paths.
+            batch_size (int): Images per inference batch and per bulk write.
+            manifest_path (Optional[str]): Local file of processed paths. When set, it is used
+                instead of querying `collection_name` to find already-processed media.
+            cache (Optional[ResultCache]): Detection cache shared with other runs.
+            pool (Optional[DetectionWorkerPool]): Run inference in these worker processes
+                instead of this one. The workers use their own cache connections.
+        """
+        self.model = model
+        self.storage = storage
+        self.collection_name = collection_name
+        self.path_column = path_column
+        self.batch_size = batch_size
+        self.manifest_path = manifest_path
+        self.cache = cache
+        self.pool = pool
+
+    async def ensure_indexes(self) -> None:
+        """Create the lookup indexes used by the API and by incremental runs."""
+        await self.storage.create_indexes(["image_path"], self.collection_name, unique=True)
+        await self.storage.create_indexes(["detections.class"], self.collection_name)
+
+    async def processed_paths(self) -> Set[str]:
+        """Return media paths that already have detections."""
+        if self.manifest_path:
+            if not os.path.exists(self.manifest_path):
+                return set()
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return {line.strip() for line in f if line.strip()}
+
+        collection = self.storage.db[self.collection_name]
+        cursor = collection.find({}, {"image_path": True, "_id": False})
+        return {doc["image_path"] async for doc in cursor}
+
+    async def find_new_media(self, media_dir: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield media paths without detections, from `media_dir` or the message collection."""
+        done = await self.processed_paths()
+        seen = set()
+
+        async def source():
+            if media_dir:
+                for path in list_images(media_dir):
+                    yield path
+            else:
+                async for path in self.storage.iter_media_paths(self.path_column):
+                    yield path
+
+        async for path in source():
+            if path not in done and path not in seen:
+                seen.add(path)
+                yield path
+
+    def _record_manifest(self, image_paths: Iterable[str]) -> None:
+        """Append processed paths to the local manifest."""
+        if not self.manifest_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{path}\n" for path in image_paths)
+
+    async def process_batch(self, image_paths: List[str]) -> int:
+        """Run inference on one batch off the event loop and persist the results."""
+        if self.pool is not None:
+            records = await asyncio.to_thread(self.pool.map, image_paths)
+        else:
+            records = await asyncio.to_thread(
+                get_detections_batched, self.model, image_paths, batch_size=self.batch_size, cache=self.cache
+            )
+        # Images without a record either failed to decode or are not on disk (yet)
+        decoded = {record["image_path"] for record in records}
+        failed = [path for path in dict.fromkeys(image_paths) if path not in decoded]
+        missing = {path for path in failed if not os.path.isfile(path)}
+        if missing:
+            # Possibly still downloading: leave them unrecorded so a later run retries them
+            logger.warning(f"Skipping {len(missing)} missing media files; they will be retried on the next run.")
+        # Files that exist but cannot be decoded are stored with an error so later runs skip them
+        records.extend(
+            {"image_path": path, "detections": [], "error": UNDECODABLE}
+            for path in failed if path not in missing
+        )
+
+        detected_at = datetime.now(timezone.utc)
+        for record in records:
+            record["detected_at"] = detected_at
+
+        await self.storage.upsert_data(records, key="image_path", collection_name=self.collection_name)
+        self._record_manifest(record["image_path"] for record in records)
+        return len(records)
+
+    async def run(self, media_dir: Optional[str] = None) -> int:
+        """
+        Detect objects in all new media and persist them.
+
+        Args:
+            media_dir (Optional[str]): Scan this directory instead of the message collection.
+
+        Returns:
+            int: Number of images processed in this run.
+        """
+        await self.ensure_indexes()
+
+        processed, batch = 0, []
+        async for path in self.find_new_media(media_dir):
+            batch.append(path)
+            if len(batch) >= self.batch_size:
+                processed += await self.process_batch(batch)
+                batch = []
+                logger.info(f"Stored detections for {processed} new images.")
+
+        if batch:
+            processed += await self.process_batch(batch)
+
+        logger.info(f"Detection stage finished: {processed} new images processed.")
+        return processed
+
+async def main(model_name: str, media_dir: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE, manifest_path: Optional[str] = None, use_cache: bool = True, workers: int = 0):
+    storage = await StorageInterface.create_storage("mongo")
+    model, cache, pool = None, None, None
+    if workers > 0:
+        # The workers load their own models; this process only feeds them paths
+        pool = DetectionWorkerPool(model_name, num_workers=workers, chunk_size=batch_size, use_cache=use_cache)
+    else:
+        model = get_model(model_name)
+        cache = get_detection_cache(model) if use_cache else None
+
+    try:
+        stage = DetectionStage(model, storage, batch_size=batch_size, manifest_path=manifest_path, cache=cache, pool=pool)
+        await stage.run(media_dir)
+    finally:
+        await storage.close()
+        if cache is not None:
+            cache.close()
+        if pool is not None:
+            pool.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run object detection on media without stored detections.")
+    parser.add_argument("--model", default="yolo11n.pt")
+    parser.add_argument("--media-dir", default=None, help="Scan a directory instead of the message collection")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--manifest", default=None, help="Track processed paths in a local manifest file")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--workers", type=int, default=0, help="Run inference in this many worker processes (0 = in-process)")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile/tracemalloc reports to logs/profiles")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable()
+
+    asyncio.run(main(args.model, args.media_dir, args.batch_size, args.manifest, not args.no_cache, args.workers))
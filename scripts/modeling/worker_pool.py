@@ -0,0 +1,116 @@
+import os
+import sys
+import multiprocessing as mp
+from collections import deque
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+
+# Setup logger for detection workers
+sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.modeling.yolo import get_model, get_detection_cache, iter_detections, _chunked, DEFAULT_IMGSZ
+
+logger = setup_logger("yolo_workers")
+
+# Per-process state, populated once by `_init_worker`
+_worker_model = None
+_worker_cache = None
+_worker_settings: Dict[str, Any] = {}
+
+def _init_worker(model_name: str, torch_threads: int, settings: Dict[str, Any], use_cache: bool) -> None:
+    """Pin the torch thread count and load the model (and its detection cache) once per worker process."""
+    global _worker_model, _worker_cache, _worker_settings
+
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    _worker_model = get_model(model_name)
+    _worker_cache = get_detection_cache(_worker_model, **settings) if use_cache else None
+    _worker_settings = settings
+    logger.info(f"Detection worker {os.getpid()} ready ({model_name}, {torch_threads} torch threads).")
+
+def _detect_chunk(image_paths: List[str]) -> List[Dict[str, Any]]:
+    """Run one chunk of image paths through the worker's resident model."""
+    return list(iter_detections(
+        _worker_model,
+        image_paths,
+        batch_size=len(image_paths),
+        num_workers=1,
+        cache=_worker_cache,
+        **_worker_settings
+    ))
+
+class DetectionWorkerPool:
+    """
+    Pool of processes that each keep a warm YOLO model.
+
+    Image paths are chunked onto the pool's task queue; results come back in input order.
+    At most `max_in_flight` chunks are queued at a time, so a long or lazy input is
+    read only as fast as the workers keep up.
+    """
+
+    def __init__(self, model_name: str, num_workers: Optional[int] = None, torch_threads: Optional[int] = None, chunk_size: int = 8, max_in_flight: Optional[int] = None, imgsz: int = DEFAULT_IMGSZ, use_cache: bool = True, **predict_kwargs):
+        """
+        Start the worker processes.
+
+        Args:
+            model_name (str): YOLO weights loaded by every worker.
+            num_workers (Optional[int]): Number of processes. Defaults to the CPU count.
+            torch_threads (Optional[int]): Torch intra-op threads per worker. Defaults to
+                cpu_count // num_workers so the pool does not oversubscribe cores.
+            chunk_size (int): Images sent to a worker per task (its batch size).
+            max_in_flight (Optional[int]): Chunks submitted but not yet consumed. Defaults to
+                twice the number of workers, which keeps every worker busy.
+            imgsz (int): Square model input size.
+            use_cache (bool): Let each worker read and fill the shared detection cache.
+            **predict_kwargs: Extra arguments forwarded to the model (conf, iou, ...).
+        """
+        cpu_count = os.cpu_count() or 1
+        self.num_workers = num_workers or cpu_count
+        self.torch_threads = torch_threads or max(1, cpu_count // self.num_workers)
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or 2 * self.num_workers
+
+        settings = {"imgsz": imgsz, **predict_kwargs}
+        context = mp.get_context("spawn")  # torch is not fork-safe once initialised
+        self.pool = context.Pool(
+            processes=self.num_workers,
+            initializer=_init_worker,
+            initargs=(model_name, self.torch_threads, settings, use_cache)
+        )
+        logger.info(f"Started {self.num_workers} detection workers with {self.torch_threads} torch threads each.")
+
+    def imap(self, image_paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Lazily yield detection records for `image_paths` in input order."""
+        # Pool.imap drains its input up front; a window of apply_async calls keeps it bounded
+        pending = deque()
+        for chunk in _chunked(image_paths, self.chunk_size):
+            if len(pending) >= self.max_in_flight:
+                yield from pending.popleft().get()
+            pending.append(self.pool.apply_async(_detect_chunk, (chunk,)))
+
+        while pending:
+            yield from pending.popleft().get()
+
+    def map(self, image_paths: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return detection records for `image_paths` in input order."""
+        return list(self.imap(image_paths))
+
+    def close(self) -> None:
+        """Stop accepting work and wait for the workers to exit."""
+        self.pool.close()
+        self.pool.join()
+        logger.info("Detection workers stopped.")
+
+    def terminate(self) -> None:
+        """Stop the workers immediately."""
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self) -> 'DetectionWorkerPool':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
@@ -1,16 +1,123 @@
+import os
+import sys
+import cv2
+import numpy as np
+import ultralytics
 from ultralytics import YOLO
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+
+# Setup logger for detection
+sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
+from scripts.utils.logger import setup_logger
+from scripts.utils.result_cache import ResultCache, hash_file
+from scripts.utils.file_utils import list_images
+from scripts.utils.metrics import timed, track, record_items
+from scripts.utils.profiling import profiled
+
+logger = setup_logger("yolo")
+
+DEFAULT_IMGSZ = 640
+DEFAULT_BATCH_SIZE = 16
+LETTERBOX_COLOR = (114, 114, 114)
+
+# Image preprocessing recorded in the cache namespace
+LETTERBOX = "letterbox"  # Square canvas built by `letterbox` (batched engine)
+RECT = "rect"  # ultralytics' minimal-padding resize of a path (`get_detections`)
 
 def get_model(model_name):
 
     return YOLO(model_name)
 
-def get_detections(model, image_paths):
+def detection_namespace(model, imgsz: int = DEFAULT_IMGSZ, preprocess: str = LETTERBOX, **predict_kwargs) -> str:
+    """
+    Cache namespace for detections produced by `model` with the given settings.
+
+    Args:
+        model: A loaded YOLO model.
+        imgsz (int): Model input size.
+        preprocess (str): How images reach the model: `LETTERBOX` (square canvas, the
+            batched path) or `RECT` (ultralytics' own resize of a path, `get_detections`).
+        **predict_kwargs: Other inference settings (conf, iou, ...) that affect the detections.
+    """
+    model_name = getattr(model, "ckpt_path", None) or getattr(model, "model_name", None) or str(model)
+    return ResultCache.make_namespace(
+        task="detect",
+        model=os.path.basename(str(model_name)),
+        version=ultralytics.__version__,
+        imgsz=imgsz,
+        preprocess=preprocess,
+        **{key: value for key, value in predict_kwargs.items() if key != "verbose"}
+    )
+
+def get_detection_cache(model, db_path: Optional[str] = None, max_entries: int = 100_000, imgsz: int = DEFAULT_IMGSZ, preprocess: str = LETTERBOX, **predict_kwargs) -> ResultCache:
+    """
+    Open the persistent detection cache for a model and its inference settings.
+
+    Args:
+        model: A loaded YOLO model.
+        db_path (Optional[str]): SQLite file backing the cache.
+        max_entries (int): LRU size limit.
+        imgsz (int): Model input size; always part of the namespace so callers that rely
+            on the default share entries with callers that pass it explicitly.
+        preprocess (str): `LETTERBOX` for the batched engine, `RECT` for `get_detections`.
+        **predict_kwargs: Other inference settings (conf, iou, ...) that affect the detections.
+
+    Returns:
+        ResultCache: Cache namespaced on model name/version, preprocessing and thresholds.
+    """
+    namespace = detection_namespace(model, imgsz=imgsz, preprocess=preprocess, **predict_kwargs)
+    return ResultCache(db_path, namespace=namespace, max_entries=max_entries)
+
+def _check_cache(cache: Optional[ResultCache], model, imgsz: int, preprocess: str, predict_kwargs: Dict[str, Any]) -> None:
+    """Refuse a cache opened for other settings, which would mix their results with these."""
+    if cache is None:
+        return
+    expected = detection_namespace(model, imgsz=imgsz, preprocess=preprocess, **predict_kwargs)
+    if cache.namespace != expected:
+        raise ValueError(
+            f"Detection cache namespace {cache.namespace} does not match the inference settings {expected}; "
+            "open it with get_detection_cache() and the same settings"
+        )
+
+def cached_detections(cache: Optional[ResultCache], content_hashes: Iterable[Optional[str]]) -> Dict[str, Any]:
+    """Look up stored detections for content hashes in one query; None hashes are skipped."""
+    if cache is None:
+        return {}
+    return cache.get_many(content_hash for content_hash in content_hashes if content_hash)
+
+def store_detections(cache: Optional[ResultCache], detections: Dict[Optional[str], Any]) -> None:
+    """Write freshly computed detections, keyed by content hash, in one transaction."""
+    if cache is None:
+        return
+    cache.set_many({content_hash: value for content_hash, value in detections.items() if content_hash})
+
+def _safe_hash(img_path: str) -> Optional[str]:
+    """Hash an image file, returning None if it cannot be read."""
+    try:
+        return hash_file(img_path)
+    except OSError as e:
+        logger.error(f"Failed to hash image: {img_path}. Error: {e}")
+        return None
+
+@timed("get_detections")
+@profiled("detect")
+def get_detections(model, image_paths, cache: Optional[ResultCache] = None, imgsz: int = DEFAULT_IMGSZ, **predict_kwargs):
+    # The cache must be opened with preprocess=RECT and these settings
+    _check_cache(cache, model, imgsz, RECT, predict_kwargs)
 
     # Process each image
     detections = []
     for img_path in image_paths:
-        results = model(img_path)
-        
+        content_hash = _safe_hash(img_path) if cache is not None else None
+        cached = cache.get(content_hash) if content_hash else None
+        if cached is not None:
+            detections.append({"image_path": img_path, "detections": cached})
+            continue
+
+        results = model(img_path, imgsz=imgsz, **predict_kwargs)
+
         detected_objects = []
         for result in results:
             for box in result.boxes:
@@ -19,10 +126,209 @@ def get_detections(model, image_paths):
                     "confidence": float(box.conf),  # Confidence score
                     "bbox": box.xyxy.tolist()[0]  # Bounding box [x1, y1, x2, y2]
                 })
-        
+
         detections.append({
             "image_path": img_path,
             "detections": detected_objects
         })
+        if content_hash:
+            cache.set(content_hash, detected_objects)
+
+    record_items("get_detections", len(detections))
+    return detections
+
+# ==========================================
+# Batched Detection Engine
+# ==========================================
+
+def letterbox(image: np.ndarray, imgsz: int = DEFAULT_IMGSZ) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize an image to a square canvas while keeping its aspect ratio.
+
+    Args:
+        image (np.ndarray): BGR image as decoded by OpenCV.
+        imgsz (int): Side of the square model input.
+
+    Returns:
+        Tuple[np.ndarray, float, Tuple[float, float]]: Padded image, scale ratio and (pad_w, pad_h).
+    """
+    height, width = image.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_w, pad_h = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+
+    return image, ratio, (left, top)
+
+def decode_image(data: bytes) -> Optional[np.ndarray]:
+    """Decode encoded image bytes (JPEG, PNG, ...) in memory, returning None if invalid."""
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+def _prepare_array(image: np.ndarray, image_path: str, imgsz: int) -> Dict[str, Any]:
+    """Letterbox a decoded image and keep what is needed to map boxes back."""
+    padded, ratio, pad = letterbox(image, imgsz)
+    return {
+        "image_path": image_path,
+        "image": padded,
+        "ratio": ratio,
+        "pad": pad,
+        "shape": image.shape[:2]
+    }
+
+def _prepare_image(img_path: str, imgsz: int) -> Optional[Dict[str, Any]]:
+    """Decode and letterbox a single image (runs inside the loader thread pool)."""
+    image = cv2.imread(img_path)
+    if image is None:
+        logger.error(f"Failed to decode image: {img_path}")
+        return None
+
+    return _prepare_array(image, img_path, imgsz)
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Yield successive lists of `size` items from any iterable."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _extract_batch(results, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert one batch of model results into detection records using whole-tensor ops."""
+    detections = []
+    for result, item in zip(results, batch):
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            detections.append({"image_path": item["image_path"], "detections": []})
+            continue
+
+        xyxy = boxes.xyxy.cpu().numpy()
+        classes = boxes.cls.cpu().numpy().astype(int)
+        confidences = boxes.conf.cpu().numpy()
+
+        # Undo the letterbox so boxes are expressed in original image pixels
+        pad_w, pad_h = item["pad"]
+        height, width = item["shape"]
+        xyxy = (xyxy - np.array([pad_w, pad_h, pad_w, pad_h], dtype=xyxy.dtype)) / item["ratio"]
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, width)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, height)
+
+        detections.append({
+            "image_path": item["image_path"],
+            "detections": [
+                {"class": result.names[cls], "confidence": conf, "bbox": bbox}
+                for cls, conf, bbox in zip(classes.tolist(), confidences.tolist(), xyxy.tolist())
+            ]
+        })
+
+    return detections
+
+def iter_detections(model, image_paths: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE, num_workers: Optional[int] = None, imgsz: int = DEFAULT_IMGSZ, cache: Optional[ResultCache] = None, **predict_kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Run batched detection over a stream of image paths.
+
+    Images are decoded and letterboxed in a thread pool while the previous batch
+    is on the model, so only about two batches are held in memory at a time.
+
+    Args:
+        model: A loaded YOLO model (see `get_model`).
+        image_paths (Iterable[str]): Image paths; may be a lazy generator (e.g. `list_images`).
+        batch_size (int): Number of images fed to the model per call.
+        num_workers (Optional[int]): Loader threads. Defaults to the CPU count.
+        imgsz (int): Square model input size used for letterboxing.
+        cache (Optional[ResultCache]): Detection cache (see `get_detection_cache`); only misses reach the model.
+        **predict_kwargs: Extra arguments forwarded to the model (conf, iou, ...).
+
+    Yields:
+        Dict[str, Any]: {"image_path", "detections"} records in input order.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    predict_kwargs.setdefault("verbose", False)
+    _check_cache(cache, model, imgsz, LETTERBOX, predict_kwargs)
+
+    with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="yolo-loader") as executor:
+        pending = None
+        for chunk in _chunked(image_paths, batch_size):
+            # Start decoding this chunk before running inference on the previous one
+            submitted = _submit_chunk(executor, chunk, imgsz, cache)
+            if pending is not None:
+                yield from _run_batch(model, pending, imgsz, predict_kwargs, cache)
+            pending = submitted
+
+        if pending is not None:
+            yield from _run_batch(model, pending, imgsz, predict_kwargs, cache)
+
+def _submit_chunk(executor: ThreadPoolExecutor, chunk: List[str], imgsz: int, cache: Optional[ResultCache]) -> List[Dict[str, Any]]:
+    """Resolve cache hits for a chunk and schedule decoding of the misses."""
+    hashes = list(executor.map(_safe_hash, chunk)) if cache is not None else [None] * len(chunk)
+    hits = cached_detections(cache, hashes)
+
+    entries = []
+    for img_path, content_hash in zip(chunk, hashes):
+        if content_hash in hits:
+            entries.append({"image_path": img_path, "detections": hits[content_hash]})
+        else:
+            entries.append({
+                "image_path": img_path,
+                "hash": content_hash,
+                "future": executor.submit(_prepare_image, img_path, imgsz)
+            })
+    return entries
+
+def _run_batch(model, entries: List[Dict[str, Any]], imgsz: int, predict_kwargs: Dict[str, Any], cache: Optional[ResultCache] = None) -> List[Dict[str, Any]]:
+    """Run the cache misses of a prepared chunk through the model in one call."""
+    misses = [(entry, entry["future"].result()) for entry in entries if "future" in entry]
+    batch = [item for _, item in misses if item is not None]
+
+    detected = {}
+    if batch:
+        with track("detect_batch"):
+            results = model([item["image"] for item in batch], imgsz=imgsz, **predict_kwargs)
+        record_items("detect_batch", len(batch))
+        detected = {record["image_path"]: record["detections"] for record in _extract_batch(results, batch)}
+
+    store_detections(cache, {
+        entry["hash"]: detected[entry["image_path"]]
+        for entry, item in misses
+        if item is not None
+    })
+
+    records = []
+    for entry in entries:
+        if "future" not in entry:
+            records.append(entry)
+        elif entry["image_path"] in detected:
+            records.append({"image_path": entry["image_path"], "detections": detected[entry["image_path"]]})
+    return records
+
+@profiled("detect")
+def get_detections_batched(model, image_paths: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE, num_workers: Optional[int] = None, **predict_kwargs) -> List[Dict[str, Any]]:
+    """Convenience wrapper returning `iter_detections` output as a list."""
+    return list(iter_detections(model, image_paths, batch_size=batch_size, num_workers=num_workers, **predict_kwargs))
+
+def detect_arrays(model, images: List[np.ndarray], imgsz: int = DEFAULT_IMGSZ, **predict_kwargs) -> List[List[Dict[str, Any]]]:
+    """
+    Run one batched model call over already-decoded images.
+
+    Args:
+        model: A loaded YOLO model.
+        images (List[np.ndarray]): BGR images, e.g. from `decode_image`.
+        imgsz (int): Square model input size used for letterboxing.
+        **predict_kwargs: Extra arguments forwarded to the model (conf, iou, ...).
 
-    return detections
\ No newline at end of file
+    Returns:
+        List[List[Dict[str, Any]]]: Detections for each image, in input order.
+    """
+    if not images:
+        return []
+    predict_kwargs.setdefault("verbose", False)
+    batch = [_prepare_array(image, str(index), imgsz) for index, image in enumerate(images)]
+    with track("detect_batch"):
+        results = model([item["image"] for item in batch], imgsz=imgsz, **predict_kwargs)
+    record_items("detect_batch", len(batch))
+    return [record["detections"] for record in _extract_batch(results, batch)]
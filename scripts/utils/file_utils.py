@@ -1,5 +1,8 @@
 import os
 import shutil
+from typing import Iterator
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
 
 def copy_and_rename_files(file_pairs):
     try:
@@ -14,3 +17,11 @@ def copy_and_rename_files(file_pairs):
 
     except Exception as e:
         print(f"An error occurred: {e}")
+
+def list_images(media_dir: str, extensions=IMAGE_EXTENSIONS) -> Iterator[str]:
+    """Lazily walk a media directory and yield image paths in a stable order."""
+    for root, dirs, files in os.walk(media_dir):
+        dirs.sort()
+        for file in sorted(files):
+            if file.lower().endswith(extensions):
+                yield os.path.join(root, file)
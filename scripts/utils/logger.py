@@ -1,6 +1,9 @@
 import os
 import sys
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Configure logging to write to file & display in Jupyter Notebook
 # logging.basicConfig(
@@ -12,18 +15,84 @@ import logging
 #     ]
 # )
 
-def setup_logger(log_file_name, log_dir=None):
+# Queue mode hands records to a background writer thread. Off by default (CLI scripts, tests);
+# async entry points opt in with setup_logger(..., use_queue=True) or LOG_QUEUE=1
+LOG_QUEUE = os.getenv("LOG_QUEUE", "0") != "0"
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+
+_listener = None
+_use_queue = LOG_QUEUE  # Process-wide mode; an explicit use_queue sticks for later setup_logger calls
+
+class DeferredFileHandler(RotatingFileHandler):
+    """Size-rotated file handler that creates its directory and opens the file on the first record, not on import."""
+
+    def __init__(self, filename, mode="a", encoding="utf-8", max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        super().__init__(filename, mode=mode, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock `prepare` formats every record in the caller; here only exception text
+    is rendered up front, so `logger.info("%s", obj)` costs a queue put on the hot path.
+    """
+
+    def prepare(self, record):
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+def stop_queue_listener():
+    """Flush queued records and stop the background writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+_use_queue = LOG_QUEUE  # Process-wide mode; an explicit use_queue sticks for later setup_logger calls
+
+atexit.register(stop_queue_listener)
+
+def _route_to_listener(handlers):
+    """Start the writer thread once; later calls swap its handlers instead of starting another."""
+    global _listener
+    if _listener is None:
+        _listener = QueueListener(queue.SimpleQueue(), *handlers, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+    previous, _listener.handlers = _listener.handlers, tuple(handlers)
+    for handler in previous:
+        handler.close()
+    return _listener
+
+def setup_logger(log_file_name, log_dir=None, use_queue=None):
     """
     Sets up a logger that writes different log levels to separate files.
     - INFO and higher go to an 'info.log' file.
     - WARNING and higher go to a 'warning.log' file.
     - ERROR and higher go to an 'error.log' file.
+
+    Files rotate at LOG_MAX_BYTES. In queue mode the root logger only enqueues records
+    and a single QueueListener thread formats and writes them, so logging from a
+    coroutine never blocks the event loop on disk or stdout. Queue mode is opt-in
+    (LOG_QUEUE=1, or use_queue=True from the API and the async pipeline runner); once
+    chosen it also applies to later calls that leave `use_queue` unset.
     """
+    global _use_queue
+    if use_queue is not None:
+        _use_queue = use_queue
+    use_queue = _use_queue
     if not log_dir:
         log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'logs')
 
-    # Ensure log directory exists
-    os.makedirs(log_dir, exist_ok=True)
+    # The log directory and files are created lazily by DeferredFileHandler
 
     # Define log format
     log_format = "%(asctime)s - %(levelname)s - %(message)s"
@@ -39,13 +108,13 @@ def setup_logger(log_file_name, log_dir=None):
         logger.handlers.clear()
 
     # Create handlers for different log levels
-    info_handler = logging.FileHandler(os.path.join(log_dir, f"{log_file_name}_info.log"), encoding="utf-8")
+    info_handler = DeferredFileHandler(os.path.join(log_dir, f"{log_file_name}_info.log"))
     info_handler.setLevel(logging.INFO)
 
-    warning_handler = logging.FileHandler(os.path.join(log_dir, f"{log_file_name}_warning.log"), encoding="utf-8")
+    warning_handler = DeferredFileHandler(os.path.join(log_dir, f"{log_file_name}_warning.log"))
     warning_handler.setLevel(logging.WARNING)
 
-    error_handler = logging.FileHandler(os.path.join(log_dir, f"{log_file_name}_error.log"), encoding="utf-8")
+    error_handler = DeferredFileHandler(os.path.join(log_dir, f"{log_file_name}_error.log"))
     error_handler.setLevel(logging.ERROR)
 
     # Console  handler
@@ -76,8 +145,15 @@ def setup_logger(log_file_name, log_dir=None):
     # formatter = logging.Formatter(fmt=log_format, datefmt=date_format)
 
     # Apply formatter to handlers
-    for handler in [info_handler, warning_handler, error_handler, console_handler]:
+    handlers = [info_handler, warning_handler, error_handler, console_handler]
+    for handler in handlers:
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
+
+    if use_queue:
+        logger.addHandler(DeferredQueueHandler(_route_to_listener(handlers).queue))
+    else:
+        stop_queue_listener()
+        for handler in handlers:
+            logger.addHandler(handler)
 
     return logger
\ No newline at end of file
@@ -0,0 +1,213 @@
+import time
+import inspect
+import threading
+from bisect import bisect_left
+from functools import wraps
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from a single record up to a full channel/batch
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Metric:
+    """Base class for a named metric with per-label-set values."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str = ""):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    """Monotonically increasing count (records, bytes, errors, ...)."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str = ""):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+class Gauge(Counter):
+    """Value that can go up and down (queue depth, batch size, ...)."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+class Histogram(Metric):
+    """Cumulative bucketed distribution with sum and count, as in the Prometheus text format."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(_label_key(labels))
+        return state[2] if state else 0
+
+    def total(self, **labels: Any) -> float:
+        state = self._values.get(_label_key(labels))
+        return state[1] if state else 0.0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels(key, {'le': le})} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(key)} {count}"
+
+class Registry:
+    """In-process collection of metrics, rendered on demand in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} already registered as {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str = "") -> Counter:
+        return self._get_or_create(Counter, name, documentation)
+
+    def gauge(self, name: str, documentation: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, documentation)
+
+    def histogram(self, name: str, documentation: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+REGISTRY = Registry()
+
+# ==========================================
+# ETL Stage Metrics
+# ==========================================
+
+STAGE_DURATION = REGISTRY.histogram("etl_stage_duration_seconds", "Latency of one call to an ETL stage.")
+STAGE_CALLS = REGISTRY.counter("etl_stage_calls_total", "Calls to an ETL stage by outcome.")
+STAGE_RECORDS = REGISTRY.counter("etl_stage_records_total", "Records (messages, rows, images) handled by an ETL stage.")
+STAGE_BYTES = REGISTRY.counter("etl_stage_bytes_total", "Bytes handled by an ETL stage.")
+
+@contextmanager
+def track(stage: str, **labels: Any):
+    """
+    Time a block as one call to `stage`, counting it as ok or error.
+
+    Example:
+        with track("clean", backend="arrow"):
+            ...
+    """
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage, **labels)
+        STAGE_CALLS.inc(stage=stage, status=status, **labels)
+
+def record_items(stage: str, count: int, **labels: Any) -> None:
+    """Add `count` records to a stage's throughput counter."""
+    if count:
+        STAGE_RECORDS.inc(count, stage=stage, **labels)
+
+def record_bytes(stage: str, size: int, **labels: Any) -> None:
+    """Add `size` bytes to a stage's byte counter."""
+    if size:
+        STAGE_BYTES.inc(size, stage=stage, **labels)
+
+def timed(stage: str, **labels: Any) -> Callable:
+    """Decorator form of `track` for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track(stage, **labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(stage, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def render_prometheus(registry: Registry = REGISTRY) -> str:
+    """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+    return registry.render()
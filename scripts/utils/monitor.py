@@ -10,7 +10,7 @@ from collections import defaultdict
 # Setup logger for data_loader
 sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
 from scripts.utils.logger import setup_logger
-from scripts.data_utils.loaders import load_json
+from scripts.utils.records import TelegramMessage
 from scripts.utils.telegram_client import TelegramAPI
 from scripts.utils.storage_interface import StorageInterface
 
@@ -18,9 +18,6 @@ from scripts.utils.storage_interface import StorageInterface
 # logger = logging.getLogger(__name__)
 logger = setup_logger("scraper")
 
-# Load environment variables
-load_dotenv()
-
 CONFIG_PATH = os.path.join('..', 'resources', 'configs')
 MEDIA_DIR = os.path.join('..', 'resources', 'downloads')
 SESSION_FILE = os.path.join('..', 'fetching-E-commerce-data.session')
@@ -94,7 +91,7 @@ class TelegramMonitor:
                 aggregated_data = await self._aggregate_messages(messages)
                 await self.storage.save_data([aggregated_data])
 
-    async def _aggregate_messages(self, messages: List) -> Dict:
+    async def _aggregate_messages(self, messages: List) -> TelegramMessage:
         """
         Aggregate messages in a group into a single data structure.
 
@@ -102,19 +99,18 @@ class TelegramMonitor:
             messages (List): List of messages in the group.
 
         Returns:
-            Dict: Aggregated data for the group.
+            TelegramMessage: Aggregated data for the group.
         """
         group_id = messages[0].grouped_id or messages[0].id
-        aggregated_data = {
-            "Group ID": group_id,
-            "Message IDs": [message.id for message in messages],
-            "Message": "\n".join(message.message for message in messages if message.message),
-            "Text": "\n".join(message.text for message in messages if message.text),
-            "Date": messages[0].date.isoformat(),  # Use the earliest message's date
-            "Sender ID": messages[0].sender_id,  # Use the first message's sender
-            "Channel": messages[0].chat.username,
-            "Media Path": []
-        }
+        aggregated_data = TelegramMessage(
+            group_id=group_id,
+            message_ids=[message.id for message in messages],
+            message="\n".join(message.message for message in messages if message.message),
+            text="\n".join(message.text for message in messages if message.text),
+            date=messages[0].date.isoformat(),  # Use the earliest message's date
+            sender_id=messages[0].sender_id,  # Use the first message's sender
+            channel=messages[0].chat.username,
+        )
 
         # Download media and save metadata
         for message in messages:
@@ -132,7 +128,7 @@ class TelegramMonitor:
                             )
                         except:
                             file_id = media_paths[0]
-                        aggregated_data["Media Path"].append(file_id)
+                        aggregated_data.media_path.append(file_id)
                 except Exception as e:
                     logger.error(f"Error downloading media from {message.chat.username}: {e}")
 
@@ -154,6 +150,11 @@ async def main(channels_filepath: str, media_dir: str):
         channels_filepath (str): Path to the JSON file containing channel usernames.
         media_dir (str): Directory to save downloaded media files.
     """
+    # Load environment variables
+    load_dotenv()
+
+    # loaders pulls in pandas, so it is imported only when the monitor starts
+    from scripts.data_utils.loaders import load_json
     try:
         channels = load_json(channels_filepath)
         channel_usernames = channels.get('channels', [])
@@ -0,0 +1,153 @@
+import os
+import time
+import pstats
+import inspect
+import cProfile
+import threading
+import tracemalloc
+from functools import wraps
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+# Opt-in: ETL_PROFILE=1 profiles every stage, ETL_PROFILE=clean,storage.save only those
+PROFILE_ENV = "ETL_PROFILE"
+PROFILE_DIR = os.getenv("ETL_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'logs', 'profiles'))
+TOP_ALLOCATIONS = int(os.getenv("ETL_PROFILE_TOP", "25"))
+
+_enabled = False
+_stages: Optional[frozenset] = None  # None means every stage
+_active = threading.local()
+
+# tracemalloc is process-wide: the first open stage starts it, the last one to close stops it
+_tracing_lock = threading.Lock()
+_tracing_stages = 0
+_started_tracing = False
+
+def enable(stages: Optional[Iterable[str]] = None, output_dir: Optional[str] = None) -> None:
+    """
+    Turn profiling on for this process (e.g. from a --profile CLI flag).
+
+    Args:
+        stages (Optional[Iterable[str]]): Stage names to profile. Defaults to all.
+        output_dir (Optional[str]): Where .prof and allocation reports are written.
+    """
+    global _enabled, _stages, PROFILE_DIR
+    _enabled = True
+    _stages = frozenset(stages) if stages else None
+    if output_dir:
+        PROFILE_DIR = output_dir
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+def _configure_from_env() -> None:
+    value = os.getenv(PROFILE_ENV, "").strip()
+    if value and value.lower() not in ("0", "false", "no"):
+        stages = None if value.lower() in ("1", "true", "yes", "all") else [stage.strip() for stage in value.split(",") if stage.strip()]
+        enable(stages)
+
+_configure_from_env()
+
+def is_enabled(stage: Optional[str] = None) -> bool:
+    return _enabled and (stage is None or _stages is None or stage in _stages)
+
+def _acquire_tracing() -> None:
+    global _tracing_stages, _started_tracing
+    with _tracing_lock:
+        if _tracing_stages == 0:
+            # Leave tracing alone if someone else (e.g. PYTHONTRACEMALLOC) turned it on
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+        _tracing_stages += 1
+
+def _release_tracing() -> None:
+    global _tracing_stages, _started_tracing
+    with _tracing_lock:
+        _tracing_stages -= 1
+        if _tracing_stages == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+def _write_reports(stage: str, profiler: Optional[cProfile.Profile], before, after, elapsed: float) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    prefix = os.path.join(PROFILE_DIR, f"{stage}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident() % 10_000}")
+
+    if profiler is not None:
+        profiler.dump_stats(f"{prefix}.prof")
+
+    with open(f"{prefix}-alloc.txt", "w", encoding="utf-8") as f:
+        f.write(f"stage: {stage}\nseconds: {elapsed:.4f}\n")
+        if profiler is not None:
+            f.write(f"cprofile: {prefix}.prof (open with `python -m pstats` or snakeviz)\n\n")
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats("cumulative").print_stats(15)
+        else:
+            f.write("cprofile: covered by the enclosing stage's profile\n")
+
+        current, peak = tracemalloc.get_traced_memory()
+        f.write(f"\ntraced memory: current {current / 1024 / 1024:.2f} MiB, peak {peak / 1024 / 1024:.2f} MiB\n")
+        f.write(f"top {TOP_ALLOCATIONS} allocation growth by line:\n")
+        # Leave out allocations made by the profiler itself
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+        for stat in after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")[:TOP_ALLOCATIONS]:
+            f.write(f"  {stat}\n")
+
+@contextmanager
+def profile_stage(stage: str):
+    """
+    Capture cProfile stats and tracemalloc allocation growth for one stage.
+
+    A no-op unless profiling is enabled for `stage`. Nested stages in the same thread
+    share the outer cProfile run (only one profiler can be active) but still get
+    their own allocation report. For coroutines, the profile also covers whatever
+    else the event loop ran while the stage was awaiting. tracemalloc is stopped
+    when the last open stage exits, unless it was already tracing beforehand.
+    """
+    if not is_enabled(stage):
+        yield
+        return
+
+    _acquire_tracing()
+    before = tracemalloc.take_snapshot()
+
+    profiler = None
+    if not getattr(_active, "profiling", False):
+        profiler = cProfile.Profile()
+        _active.profiling = True
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            _active.profiling = False
+        try:
+            _write_reports(stage, profiler, before, tracemalloc.take_snapshot(), elapsed)
+        finally:
+            _release_tracing()
+
+def profiled(stage: str) -> Callable:
+    """Decorator form of `profile_stage` for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                with profile_stage(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with profile_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# (attribute, canonical column) pairs shared by the scraper, monitor, storage and cleaning
+MESSAGE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("group_id", "Group ID"),
+    ("message_ids", "Message IDs"),
+    ("text", "Text"),
+    ("message", "Message"),
+    ("date", "Date"),
+    ("sender_id", "Sender ID"),
+    ("media_path", "Media Path"),
+    ("channel", "Channel"),
+)
+MESSAGE_COLUMNS: Tuple[str, ...] = tuple(column for _, column in MESSAGE_FIELDS)
+
+def _normalize_key(key: str) -> str:
+    return key.lower().replace(" ", "_").replace("-", "_")
+
+# Accept canonical columns, snake_case attributes and their common spellings
+_KEY_ALIASES: Dict[str, str] = {
+    **{_normalize_key(column): attribute for attribute, column in MESSAGE_FIELDS},
+    "message_id": "message_ids",
+    "media_paths": "media_path",
+    "channel_username": "channel",
+}
+
+# Lowercased copy of business_name that the API's prefix/exact filters run against
+BUSINESS_NAME_KEY = "business_name_lower"
+
+def normalize_business_name(name: str) -> str:
+    """Normalization applied both when storing and when querying business names."""
+    return name.strip().lower()
+
+def with_business_name_key(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Set `BUSINESS_NAME_KEY` on a dict row that carries a business_name (in place)."""
+    name = row.get("business_name")
+    if isinstance(name, str):
+        row[BUSINESS_NAME_KEY] = normalize_business_name(name)
+    return row
+
+class TelegramMessage:
+    """
+    Compact record for one grouped Telegram message (an album or a single post).
+
+    Uses `__slots__` instead of a per-record dict. `to_row`/`from_row` convert to and from
+    the canonical column names ("Group ID", "Message IDs", ...) used on disk and in
+    DataFrames, and `from_row` tolerates key drift such as "channel" vs "Channel".
+    """
+
+    __slots__ = tuple(attribute for attribute, _ in MESSAGE_FIELDS)
+
+    def __init__(self, group_id: Optional[int] = None, message_ids: Optional[List[int]] = None, text: Optional[str] = None, message: str = "", date: Optional[str] = None, sender_id: Optional[int] = None, media_path: Optional[List[Any]] = None, channel: Optional[str] = None):
+        self.group_id = group_id
+        self.message_ids = message_ids if message_ids is not None else []
+        self.text = text
+        self.message = message
+        self.date = date
+        self.sender_id = sender_id
+        self.media_path = media_path if media_path is not None else []
+        self.channel = channel
+
+    def to_row(self) -> Dict[str, Any]:
+        """Return the record as a dict keyed by canonical column names."""
+        return {column: getattr(self, attribute) for attribute, column in MESSAGE_FIELDS}
+
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """Return field values in `MESSAGE_COLUMNS` order (for DataFrame.from_records)."""
+        return tuple(getattr(self, attribute) for attribute, _ in MESSAGE_FIELDS)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'TelegramMessage':
+        """Build a record from a dict using canonical, snake_case or aliased keys; unknown keys are ignored."""
+        values = {}
+        for key, value in row.items():
+            attribute = _KEY_ALIASES.get(_normalize_key(str(key)))
+            if attribute is not None and attribute not in values:
+                values[attribute] = value
+        return cls(**values)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TelegramMessage):
+            return NotImplemented
+        return self.to_tuple() == other.to_tuple()
+
+    def __repr__(self) -> str:
+        return f"TelegramMessage(group_id={self.group_id!r}, message_ids={self.message_ids!r}, channel={self.channel!r})"
+
+def as_rows(data: Iterable[Union[TelegramMessage, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Convert records to dict rows for storage backends; plain dicts pass through unchanged."""
+    return [record.to_row() if isinstance(record, TelegramMessage) else record for record in data]
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+# Setup logger for caching
+sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
+from scripts.utils.logger import setup_logger
+
+logger = setup_logger("result_cache")
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'resources', 'cache')
+HASH_CHUNK_SIZE = 1 << 20
+EVICT_FRACTION = 0.1  # Share of max_entries freed per eviction, so a full cache does not evict on every write
+
+def hash_bytes(data: bytes) -> str:
+    """Return the SHA-256 hex digest of raw content."""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Persistent SQLite cache for results computed from file content.
+
+    Entries are keyed on (namespace, content hash). The namespace captures everything
+    else the result depends on (model name/version, thresholds, ...), so changing any
+    of those naturally misses the cache. Least recently used entries are evicted once
+    `max_entries` is exceeded. The row count is tracked approximately (counted once,
+    then incremented per write) and only recounted when it crosses the limit.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, namespace: str = "default", max_entries: int = 100_000):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path (Optional[str]): SQLite file. Defaults to resources/cache/results.sqlite.
+            namespace (str): Key prefix isolating results produced with different settings.
+            max_entries (int): Maximum number of entries kept across all namespaces.
+        """
+        self.db_path = db_path or os.path.join(CACHE_DIR, "results.sqlite")
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                namespace TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                value TEXT NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, content_hash)
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_access ON results (last_access)")
+        self.conn.commit()
+        (self._approx_count,) = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()
+
+    @staticmethod
+    def make_namespace(**settings: Any) -> str:
+        """Build a stable namespace string from the settings a result depends on."""
+        return json.dumps(settings, sort_keys=True, default=str)
+
+    def get(self, content_hash: str) -> Optional[Any]:
+        """Return the cached value for a content hash, or None on a miss."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM results WHERE namespace = ? AND content_hash = ?",
+                (self.namespace, content_hash)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE results SET last_access = ? WHERE namespace = ? AND content_hash = ?",
+                (time.time(), self.namespace, content_hash)
+            )
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def get_many(self, content_hashes: Iterable[str]) -> Dict[str, Any]:
+        """Return cached values for all hits among the given content hashes."""
+        hashes = list(dict.fromkeys(content_hashes))
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT content_hash, value FROM results WHERE namespace = ? AND content_hash IN ({placeholders})",
+                    (self.namespace, *chunk)
+                ).fetchall()
+                found.update({content_hash: json.loads(value) for content_hash, value in rows})
+
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE results SET last_access = ? WHERE namespace = ? AND content_hash = ?",
+                    [(now, self.namespace, content_hash) for content_hash in found]
+                )
+                self.conn.commit()
+        return found
+
+    def set(self, content_hash: str, value: Any) -> None:
+        """Store a value for a content hash."""
+        self.set_many({content_hash: value})
+
+    def set_many(self, values: Dict[str, Any]) -> None:
+        """Store several values at once and evict least recently used entries."""
+        if not values:
+            return
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results (namespace, content_hash, value, last_access) VALUES (?, ?, ?, ?)",
+                [(self.namespace, content_hash, json.dumps(value, ensure_ascii=False), now) for content_hash, value in values.items()]
+            )
+            # Over-counts replaced rows and misses other processes' writes; _evict recounts exactly
+            self._approx_count += len(values)
+            if self._approx_count > self.max_entries:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self) -> None:
+        """Once above `max_entries`, drop least recently used entries down to (1 - EVICT_FRACTION) of it (caller holds the lock)."""
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        self._approx_count = count
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * (1 - EVICT_FRACTION))
+        self.conn.execute(
+            "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_access LIMIT ?)",
+            (excess,)
+        )
+        self._approx_count = count - excess
+        logger.info(f"Evicted {excess} least recently used cache entries.")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM results WHERE namespace = ?", (self.namespace,)).fetchone()
+        return count
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self.conn.close()
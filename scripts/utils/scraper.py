@@ -4,22 +4,20 @@ import csv
 import json
 import asyncio
 from dotenv import load_dotenv
-from collections import defaultdict
 from typing import List, Dict, Tuple
 from telethon.errors import FloodWaitError
 
 # Setup logger for data_loader
 sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
 from scripts.utils.logger import setup_logger
-from scripts.data_utils.loaders import load_json
+from scripts.utils.records import TelegramMessage
+from scripts.utils.metrics import timed, record_items
+from scripts.utils.profiling import profiled
 from scripts.utils.telegram_client import TelegramAPI
 from scripts.utils.storage_interface import StorageInterface
 
 logger = setup_logger("scraper")
 
-# Load environment variables
-load_dotenv()
-
 CONFIG_PATH = os.path.join('..', 'resources', 'configs')
 LAST_ID_FILE = os.path.join(CONFIG_PATH, 'last_id.json')
 channels_filepath = os.path.join(CONFIG_PATH, 'channels.json')
@@ -31,10 +29,10 @@ DATA_PATH = os.path.join('..', 'resources', 'data')
 MEDIA_DIR = os.path.join('..', 'resources', 'media')
 OUTPUT_DIR = os.path.join(DATA_PATH, 'raw')
 
-# Ensure the data directories exist
-os.makedirs(DATA_PATH, exist_ok=True)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-os.makedirs(MEDIA_DIR, exist_ok=True)
+def ensure_data_dirs(media_dir: str = MEDIA_DIR) -> None:
+    """Create the data and media directories (called when a scrape starts, not on import)."""
+    for path in (DATA_PATH, OUTPUT_DIR, media_dir):
+        os.makedirs(path, exist_ok=True)
 
 class TelegramScraper:
     def __init__(self, api, storage: str, media_dir: str = MEDIA_DIR):
@@ -43,76 +41,94 @@ class TelegramScraper:
         self.storage = storage
         self.media_dir = media_dir
 
-    async def fetch_messages(self, channel: str, limit: int = 100, last_id: int = None) -> Tuple[List[Dict], List]:
-        """Fetch and group messages from a Telegram channel."""
-        messages_data = defaultdict(lambda: {
-            "Group ID": None,
-            "Message IDs": [],
-            "Text": None,
-            "Message": "",
-            "Date": None,
-            "Sender ID": None,
-            "Media Path": []
-        })
+    @timed("fetch_messages")
+    async def fetch_messages(self, channel: str, limit: int = 100, last_id: int = None, min_id: int = None) -> Tuple[List[TelegramMessage], List, int]:
+        """
+        Fetch and group messages from a Telegram channel.
+
+        When `min_id` is given (0 for a channel never fetched), messages with a larger
+        id are fetched oldest first, so the ids returned form a contiguous range above
+        `min_id` even when more than `limit` messages are waiting. An album cut off by
+        `limit` is left out and fetched whole on the next call.
+        """
+        messages_data: Dict[int, TelegramMessage] = {}
         medias = []
+        fetched = 0
 
-        async for message in self.api.client.iter_messages(channel, limit=limit):
+        incremental = min_id is not None
+        options = {"min_id": min_id, "reverse": True} if incremental else {}
+        async for message in self.api.client.iter_messages(channel, limit=limit, **options):
             
             # if message.id >= last_id:
             #     continue
             
             group_id = message.grouped_id if message.grouped_id else message.id
-            msg_entry = messages_data[group_id]
-            msg_entry.update({
-                "Group ID": group_id,
-                # "Message IDs": msg_entry["Message IDs"].append([message.id]),
-                "Message IDs": msg_entry["Message IDs"] + [message.id],
-                "Text": msg_entry["Text"] or message.text,
-                "Message": msg_entry["Message"] or message.message,
-                "Date": msg_entry["Date"] or (message.date.isoformat() if message.date else None),
-                "Sender ID": msg_entry["Sender ID"] or message.sender_id,
-            })
+            msg_entry = messages_data.get(group_id)
+            if msg_entry is None:
+                msg_entry = messages_data[group_id] = TelegramMessage(group_id=group_id, channel=channel)
+
+            msg_entry.message_ids.append(message.id)
+            msg_entry.text = msg_entry.text or message.text
+            msg_entry.message = msg_entry.message or message.message
+            msg_entry.date = msg_entry.date or (message.date.isoformat() if message.date else None)
+            msg_entry.sender_id = msg_entry.sender_id or message.sender_id
 
             if message.media:
                 medias.append(message)
-                msg_entry["Media Path"].append(None)
+                msg_entry.media_path.append(None)
             
             last_id = message.id
-
+            fetched += 1
+
+        if incremental and limit and fetched >= limit and len(messages_data) > 1:
+            # The newest group may continue past the limit; drop it so it is not stored half-filled
+            tail_id, tail = next(reversed(messages_data.items()))
+            if len(tail.message_ids) > 1 or tail_id != tail.message_ids[0]:
+                del messages_data[tail_id]
+                dropped = set(tail.message_ids)
+                medias = [media for media in medias if media.id not in dropped]
+                last_id = max(mid for entry in messages_data.values() for mid in entry.message_ids)
+
+        record_items("fetch_messages", fetched)
         return list(messages_data.values()), medias, last_id
 
+    async def collect_channel(self, channel: str, limit: int, last_id: int = None, min_id: int = None) -> Tuple[List[TelegramMessage], int]:
+        """Fetch a channel's messages, download their media and attach the local media paths."""
+        channel_media_dir = os.path.join(self.media_dir, channel)
+        os.makedirs(channel_media_dir, exist_ok=True)
+        messages, medias, last_id = await self.fetch_messages(channel, limit, last_id, min_id)
+        media_paths = await self.api.download_media(medias, channel_media_dir)
+        
+        # Filter out failed downloads
+        valid_media = [(media, path) for media, path in zip(medias, media_paths) if path]
+        media_map = {media.id: path for media, path in valid_media}
+        
+        for msg in messages:
+            msg.media_path = [
+                media_map.get(mid) 
+                for mid in msg.message_ids
+                if mid in media_map
+            ]
+        return messages, last_id
+
     async def process_channel(self, channel: str, limit: int, start_from_id: int = None):
         """Process messages and media from a single channel."""
         
         last_id = start_from_id if start_from_id is not None else get_last_id(channel)
 
         try:
-            channel_media_dir = os.path.join(self.media_dir, channel)
-            os.makedirs(channel_media_dir, exist_ok=True)
-            messages, medias, last_id = await self.fetch_messages(channel, limit, last_id)
-            media_paths = await self.api.download_media(medias, channel_media_dir)
-            
-            # Filter out failed downloads
-            valid_media = [(media, path) for media, path in zip(medias, media_paths) if path]
-            media_map = {media.id: path for media, path in valid_media}
-            
-            for msg in messages:
-                msg["Media Path"] = [
-                    media_map.get(mid) 
-                    for mid in msg["Message IDs"]
-                    if mid in media_map
-                ]
-            
+            messages, last_id = await self.collect_channel(channel, limit, last_id)
             await self.storage.save_data(messages, channel)
-            logger.info(f"Processed {len(messages)} messages from {channel}")
+            logger.info("Processed %d messages from %s", len(messages), channel)
         except FloodWaitError as e:
-            logger.warning(f"Flood wait {e.seconds} sec for {channel}")
+            logger.warning("Flood wait %s sec for %s", e.seconds, channel)
             await asyncio.sleep(e.seconds)
         except Exception as e:
             logger.error(f"Error processing {channel}: {e}")
         finally:
             save_last_id(channel, last_id)
 
+    @profiled("scrape")
     async def scrape_channels(self, channels: List[str], limit: int):
         """Process multiple Telegram channels."""
         tasks = [self.process_channel(channel, limit) for channel in channels]
@@ -154,7 +170,7 @@ def save_last_id(channel, last_id, filepath=LAST_ID_FILE):
     # Write updated data back to the file
     with open(filepath, 'w') as f:
         json.dump(data, f)
-        logger.info(f"Saved last processed ID {last_id} for {channel}.")
+        logger.info("Saved last processed ID %s for %s.", last_id, channel)
 
 def sync(func):
     """Decorator to run async functions synchronously."""
@@ -165,7 +181,10 @@ def sync(func):
 @sync
 def run_fetch_process(channels, storage_type, allowed_media, media_dir=MEDIA_DIR, limit=100):
     async def main():
-        
+        # Load environment variables
+        load_dotenv()
+        ensure_data_dirs(media_dir)
+
         storage = await StorageInterface.create_storage(storage_type)
         api = TelegramAPI(
             api_id=os.getenv("API_ID"),
@@ -200,7 +219,8 @@ if __name__ == "__main__":
     #     "marakibrand", "aradabrand2", "marakisat2", "belaclassic", "AwasMart", "qnashcom"
     # ]
     
-    # Load a list of channels from a JSON file to scrape from
+    # Load a list of channels from a JSON file to scrape from (loaders pulls in pandas, so not at import time)
+    from scripts.data_utils.loaders import load_json
     channels = load_json(channels_filepath)
     CHANNELS = channels.get('channels', [])
 
@@ -0,0 +1,102 @@
+import os
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Write buffer used by streaming writers before handing a block to the file
+WRITE_BUFFER_SIZE = 1 << 20
+
+def default(obj: Any) -> Any:
+    """Fallback conversion for values the JSON backends cannot encode natively."""
+    # pd.Timestamp subclasses datetime; both serialize as ISO-8601
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    type_name = type(obj).__name__
+    if type_name == "ObjectId":
+        return str(obj)
+    if type_name in ("NaTType", "NAType"):
+        return None
+    if hasattr(obj, "tolist"):  # numpy scalars and arrays
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type_name} is not JSON serializable")
+
+class Serializer:
+    """
+    JSON serializer with a pluggable backend.
+
+    `orjson` is preferred, then `msgspec`, then the standard library. All backends emit
+    UTF-8 without ASCII escaping and encode ObjectId, Timestamp and datetime the same way.
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Initialize the serializer.
+
+        Args:
+            backend (Optional[str]): "orjson", "msgspec" or "json". Defaults to the
+                JSON_SERIALIZER environment variable, then the fastest one installed.
+        """
+        backend = backend or os.getenv("JSON_SERIALIZER") or ("orjson" if orjson else "msgspec" if msgspec else "json")
+        if backend == "orjson" and orjson is None or backend == "msgspec" and msgspec is None:
+            raise ImportError(f"JSON backend '{backend}' is not installed")
+        if backend not in ("orjson", "msgspec", "json"):
+            raise ValueError(f"Unsupported JSON backend: {backend}")
+
+        self.name = backend
+        self._dumps, self._loads = self._build(backend)
+
+    @staticmethod
+    def _build(backend: str):
+        if backend == "orjson":
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            return (lambda obj: orjson.dumps(obj, default=default, option=option)), orjson.loads
+        if backend == "msgspec":
+            encoder = msgspec.json.Encoder(enc_hook=default)
+            return encoder.encode, msgspec.json.decode
+        return (lambda obj: json.dumps(obj, ensure_ascii=False, default=default).encode("utf-8")), json.loads
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Serialize to compact UTF-8 encoded JSON."""
+        return self._dumps(obj)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None) -> str:
+        """Serialize to a JSON string, pretty-printed when `indent` is given."""
+        if indent is None:
+            return self._dumps(obj).decode("utf-8")
+        if self.name == "orjson" and indent == 2:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, indent=indent, default=default)
+
+    def loads(self, data: Any) -> Any:
+        """Deserialize JSON from str or bytes."""
+        return self._loads(data)
+
+_serializer: Optional[Serializer] = None
+
+def get_serializer() -> Serializer:
+    """Return the process-wide default serializer."""
+    global _serializer
+    if _serializer is None:
+        _serializer = Serializer()
+    return _serializer
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    return get_serializer().dumps(obj, indent=indent)
+
+def dumps_bytes(obj: Any) -> bytes:
+    return get_serializer().dumps_bytes(obj)
+
+def loads(data: Any) -> Any:
+    return get_serializer().loads(data)
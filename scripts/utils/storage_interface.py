@@ -1,34 +1,67 @@
 import os
 import sys
 import csv
-import pytz
 import json
-import gridfs
 import asyncio
-import asyncpg
-import psycopg2
 import aiofiles
-import pandas as pd
-from bson import ObjectId
-import motor.motor_asyncio
-from datetime import datetime
-from dotenv import load_dotenv
-from pymongo import MongoClient
+from functools import wraps
+from datetime import datetime, timezone
 from abc import ABC, abstractmethod
-from pymongo.errors import ConnectionFailure
-from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor
-from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from typing import List, Dict, Any, Optional, Union
 
 # Setup logger for data_loader
 sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
 from scripts.utils.logger import setup_logger
-from scripts.data_utils.loaders import CustomJSONEncoder
+from scripts.utils.serialization import get_serializer, WRITE_BUFFER_SIZE
+from scripts.utils.records import TelegramMessage, as_rows, with_business_name_key
+from scripts.utils.metrics import track, record_items
+from scripts.utils.profiling import profile_stage
 
 logger = setup_logger("StorageInterface")
 
-# Load environment variables
-load_dotenv()
+# Database drivers, pandas and pyarrow are imported by the backend that needs them,
+# so selecting the JSON backend never pays for motor/asyncpg/pyarrow imports.
+
+def _import_pyarrow():
+    """Import pyarrow and pyarrow.parquet on first use."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("The 'parquet' format requires pyarrow to be installed.") from e
+    return pa, pq
+
+def to_naive_utc(value):
+    """
+    Convert a message date to the naive UTC datetime stored in a TIMESTAMP column.
+
+    Accepts datetimes, pd.Timestamp and ISO strings. Aware values are shifted to UTC
+    before dropping the offset; naive values are assumed to already be UTC. Anything
+    else (None, NaT) is returned unchanged.
+    """
+    value = value.to_pydatetime() if hasattr(value, "to_pydatetime") else value  # pd.Timestamp
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def instrumented(operation: str):
+    """Record latency, outcome and record counts of a backend's save/retrieve call."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            backend = type(self).__name__
+            with track(f"storage.{operation}", backend=backend), profile_stage(f"storage.{operation}"):
+                result = await func(self, *args, **kwargs)
+            if operation == "save":
+                data = args[0] if args else kwargs.get("data")
+                record_items(f"storage.{operation}", len(data) if data else 0, backend=backend)
+            elif result:
+                record_items(f"storage.{operation}", len(result), backend=backend)
+            return result
+        return wrapper
+    return decorator
 
 class StorageInterface(ABC):
     """
@@ -38,7 +71,12 @@ class StorageInterface(ABC):
     @staticmethod
     def get_config_info(storage_type: str) -> Dict[str, Any]:
         """Retrieve configuration information from environment variables."""
-        if storage_type not in ["mongo", "postgres", "json", "csv"]:
+        from dotenv import load_dotenv
+
+        # Load environment variables
+        load_dotenv()
+
+        if storage_type not in ["mongo", "postgres", "json", "csv", "parquet"]:
             raise ValueError(f"Unsupported storage type: {storage_type}")
 
         config_info = {}
@@ -71,13 +109,18 @@ class StorageInterface(ABC):
                 "storage_path": os.getenv("LOCAL_STORAGE_PATH"),
                 "file_format": "csv"
             }
+        elif storage_type == "parquet":
+            config_info = {
+                "storage_path": os.getenv("LOCAL_STORAGE_PATH"),
+                "file_format": "parquet"
+            }
 
         return config_info
 
     @staticmethod
     async def create_storage(storage_type: str) -> 'StorageInterface':
         """Create a storage instance based on the specified storage type."""
-        if storage_type not in ["mongo", "postgres", "json", "csv"]:
+        if storage_type not in ["mongo", "postgres", "json", "csv", "parquet"]:
             raise ValueError(f"Unsupported storage type: {storage_type}")
 
         config_info = StorageInterface.get_config_info(storage_type)
@@ -112,12 +155,17 @@ class StorageInterface(ABC):
                 storage_path=config_info["storage_path"],
                 file_format="csv"
             )
+        elif storage_type == "parquet":
+            return LocalStorage(
+                storage_path=config_info["storage_path"],
+                file_format="parquet"
+            )
         else:
             raise ValueError("Unsupported storage type")
 
     @abstractmethod
-    def save_data(self, data: List[Dict[str, Any]]) -> None:
-        """Save data to the storage backend."""
+    def save_data(self, data: List[Union[TelegramMessage, Dict[str, Any]]]) -> None:
+        """Save data (TelegramMessage records or dict rows) to the storage backend."""
         raise NotImplementedError("This method should be implemented in subclasses")
 
     @abstractmethod
@@ -135,6 +183,9 @@ class MongoDBStorage(StorageInterface):
     MongoDB storage implementation using GridFS for media storage.
     """
     def __init__(self, uri: str, db_name: str, collection_name: str, use_gridfs: bool = False):
+        import motor.motor_asyncio
+        from pymongo.errors import ConnectionFailure
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 
         try:
             # self.client = MongoClient(uri)
@@ -149,7 +200,8 @@ class MongoDBStorage(StorageInterface):
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
 
-    async def save_data(self, data: List[Dict[str, Any]], collection_name=None) -> None:
+    @instrumented("save")
+    async def save_data(self, data: List[Union[TelegramMessage, Dict[str, Any]]], collection_name=None) -> None:
         """Save structured data into MongoDB."""
         if data:
             try:
@@ -158,11 +210,12 @@ class MongoDBStorage(StorageInterface):
                 collection = self.collection
                 if collection_name:
                     collection = self.db[collection_name]
-                await collection.insert_many(data)
+                await collection.insert_many([with_business_name_key(row) for row in as_rows(data)])
             except Exception as e:
                 logger.error(f"Error saving data to MongoDB: {e}")
                 raise
 
+    @instrumented("retrieve")
     async def retrieve_data(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Retrieve data from MongoDB based on the query."""
         try:
@@ -193,6 +246,9 @@ class MongoDBStorage(StorageInterface):
 
     async def retrieve_media(self, file_id: str, output_path: str) -> None:
         """Retrieve media file from GridFS."""
+        import gridfs
+        from bson import ObjectId
+
         if not self.use_gridfs:
             raise ValueError("GridFS is not enabled")
         try:
@@ -230,6 +286,38 @@ class MongoDBStorage(StorageInterface):
         except Exception as e:
             logger.error(f"Error closing MongoDB connection: {e}")
 
+    async def upsert_data(self, data: List[Dict[str, Any]], key: str, collection_name: Optional[str] = None) -> int:
+        """Bulk upsert documents keyed on `key`, so re-running a batch never duplicates it."""
+        from pymongo import UpdateOne
+
+        if not data:
+            return 0
+        try:
+            collection = self.db[collection_name] if collection_name else self.collection
+            operations = [UpdateOne({key: d[key]}, {"$set": with_business_name_key(d)}, upsert=True) for d in data]
+            result = await collection.bulk_write(operations, ordered=False)
+            return result.upserted_count + result.modified_count
+        except Exception as e:
+            logger.error(f"Error upserting data to MongoDB: {e}")
+            raise
+
+    async def create_indexes(self, keys: List[str], collection_name: Optional[str] = None, unique: bool = False) -> None:
+        """Ensure single-field ascending indexes exist on `keys`."""
+        from pymongo import ASCENDING
+
+        collection = self.db[collection_name] if collection_name else self.collection
+        for key in keys:
+            await collection.create_index([(key, ASCENDING)], unique=unique)
+
+    async def iter_media_paths(self, path_column: str, extensions=(".jpg", ".png", ".jpeg")):
+        """Stream media paths stored in `path_column` without loading every document."""
+        cursor = self.collection.find({path_column: {"$exists": True, "$ne": None}}, {path_column: True, "_id": False})
+        async for doc in cursor:
+            paths = doc[path_column]
+            for path in paths if isinstance(paths, list) else [paths]:
+                if isinstance(path, str) and path.endswith(extensions):
+                    yield path
+
     async def extract_media_paths(self, output_dir, path_column):
         documents = await self.collection.find({path_column: {"$exists": True, "$ne": None}}).to_list(length=None)
 
@@ -253,14 +341,9 @@ class PostgresStorage(StorageInterface):
     """
     
     def __init__(self, db_url: str, table_name: str):
-        try:
-            self.db_url = db_url
-            self.table_name = table_name
-            self.conn = None
-
-        except psycopg2.Error as e:
-            logger.error(f"Failed to connect to PostgreSQL: {e}")
-            raise
+        self.db_url = db_url
+        self.table_name = table_name
+        self.conn = None
 
     async def initialize(self):
         """Call this explicitly to establish the connection asynchronously."""
@@ -269,6 +352,8 @@ class PostgresStorage(StorageInterface):
 
     async def connect(self):
         """Connect to the PostgreSQL database."""
+        import asyncpg
+
         try:
             conn = await asyncpg.connect(self.db_url)
             await conn.execute("SELECT 1")  # Test connection
@@ -290,9 +375,17 @@ class PostgresStorage(StorageInterface):
                     message TEXT,
                     date TIMESTAMP,
                     sender_id BIGINT,
-                    media_path TEXT[]
+                    media_path TEXT[],
+                    links TEXT[],
+                    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            # Tables created before `links`/`loaded_at` existed (the dbt `telegram.raw_data` source reads both)
+            await self.conn.execute(f'''
+                ALTER TABLE {self.table_name}
+                    ADD COLUMN IF NOT EXISTS links TEXT[],
+                    ADD COLUMN IF NOT EXISTS loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ''')
             # await self.conn.execute(f'''
             #     CREATE TABLE IF NOT EXISTS {self.table_name} (
             #         id SERIAL PRIMARY KEY,
@@ -313,27 +406,27 @@ class PostgresStorage(StorageInterface):
             logger.error(f"Error creating table in PostgreSQL: {e}")
             raise
 
-    async def save_data(self, data: List[Dict[str, Any]]) -> None:
-        """Insert data into PostgreSQL."""
-        def convert_date(dt):
-            
-            dt = dt.to_pydatetime() if isinstance(dt, pd.Timestamp) else dt
-            if isinstance(dt, datetime):
-                dt = pytz.utc.localize(dt) if dt.tzinfo is None else dt.astimezone(pytz.utc)
+    @instrumented("save")
+    async def save_data(self, data: List[Union[TelegramMessage, Dict[str, Any]]]) -> None:
+        """Insert data into PostgreSQL, skipping group ids that are already stored."""
+        def convert_int(value):
+            # pandas turns an int column holding None into float64 (NaN); BIGINT needs int or NULL
+            return None if value is None or value != value else int(value)
 
         if not data:
             return
         
         try:
             query = f'''
-                INSERT INTO {self.table_name} (group_id, message_ids, message, date, sender_id, media_path)
-                VALUES ($1, $2, $3, $4, $5, $6)
+                INSERT INTO {self.table_name} (group_id, message_ids, message, date, sender_id, media_path, links)
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                ON CONFLICT (group_id) DO NOTHING
             '''
             # VALUES (%s, %s, %s, %s, %s)
-            logger.info(data)
+            logger.debug("Inserting %d records into %s", len(data), self.table_name)
             values = [(
-                d.get("Group ID"), d.get("Message IDs"), d.get("Message"), convert_date(d.get("Date")), d.get("Sender ID"), d.get("Media Path")
-            ) for d in data]
+                convert_int(d.get("Group ID")), d.get("Message IDs"), d.get("Message"), to_naive_utc(d.get("Date")), convert_int(d.get("Sender ID")), d.get("Media Path"), d.get("Links")
+            ) for d in as_rows(data)]
             
             # query = f'''
             #     INSERT INTO {self.table_name} (channel_title, channel_username, group_id, message_id, message, date, sender_id, media_path, emoji_used, youtube_links)
@@ -365,7 +458,7 @@ class PostgresStorage(StorageInterface):
             # self.cursor.executemany(query, values)
             # self.conn.commit()
 
-            logger.info(f"Successfully Inserted {len(values)} records into PostgreSQL table: {self.table_name}")
+            logger.info("Successfully Inserted %d records into PostgreSQL table: %s", len(values), self.table_name)
             
         # except psycopg2.Error as e:
         except Exception as e:
@@ -373,6 +466,7 @@ class PostgresStorage(StorageInterface):
             # self.conn.rollback()
             raise
     
+    @instrumented("retrieve")
     async def retrieve_data(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Retrieve data from PostgreSQL based on the query."""
         try:
@@ -393,32 +487,36 @@ class PostgresStorage(StorageInterface):
         """Close the PostgreSQL connection."""
         try:
             # self.cursor.close()
-            self.conn.close()
+            await self.conn.close()
         except Exception as e:
             logger.error(f"Error closing PostgreSQL connection: {e}")
 
 class LocalStorage(StorageInterface):
     """
-    Local storage implementation supporting JSON and CSV formats.
+    Local storage implementation supporting JSON, CSV and Parquet formats.
     """
         
     def __init__(self, storage_path: str, file_format: str = "json"):
         
-        if file_format.lower() not in ["json", "csv"]:
-            raise ValueError("Unsupported file format. Supported formats are 'json' and 'csv'.")
+        if file_format.lower() not in ["json", "csv", "parquet"]:
+            raise ValueError("Unsupported file format. Supported formats are 'json', 'csv' and 'parquet'.")
+        if file_format.lower() == "parquet":
+            _import_pyarrow()
         
         self.storage_path = storage_path
         self.file_format = file_format.lower()
         self.filename = "messages" + '.' + self.file_format
         self.file_path = os.path.join(storage_path, self.filename)
-        os.makedirs(self.storage_path, exist_ok=True)
 
-    async def save_data(self, data: List[Dict[str, Any]], channel: str = '') -> None:
+    @instrumented("save")
+    async def save_data(self, data: List[Union[TelegramMessage, Dict[str, Any]]], channel: str = '') -> None:
         """Save data to a local file in JSON/CSV format."""
         if not data:
             logger.warning("No data to save. Skipping file write.")
             return
-        
+        data = as_rows(data)
+        os.makedirs(self.storage_path, exist_ok=True)
+
         if channel:
             self.file_path = os.path.join(self.storage_path, f"{channel}.{self.file_format}")
 
@@ -429,24 +527,48 @@ class LocalStorage(StorageInterface):
             elif self.file_format == "csv":
                 await asyncio.to_thread(self._save_csv, data)
 
+            elif self.file_format == "parquet":
+                pa, _ = _import_pyarrow()
+                await self.save_table(pa.Table.from_pylist(data))
+
         except Exception as e:
             logger.error(f"Error saving data to local file: {e}", exc_info=True)
             raise
 
+    async def save_table(self, table: 'pa.Table', channel: str = '') -> None:
+        """Save an Arrow table, writing Parquet natively and converting for JSON/CSV."""
+        if self.file_format != "parquet":
+            await self.save_data(table.to_pylist(), channel)
+            return
+
+        if channel:
+            self.file_path = os.path.join(self.storage_path, f"{channel}.{self.file_format}")
+        _, pq = _import_pyarrow()
+        try:
+            await asyncio.to_thread(pq.write_table, table, self.file_path)
+        except Exception as e:
+            logger.error(f"Error writing Parquet file: {e}", exc_info=True)
+            raise
+
     async def _save_json_streaming(self, data: List[Dict[str, Any]]) -> None:
         """Efficiently write JSON in a streamed manner to avoid high memory usage."""
 
-        async with aiofiles.open(self.file_path, "w", encoding="utf-8") as f:
-            await f.write("[\n")  # Start JSON array
-            
+        serializer = get_serializer()
+        buffer = bytearray(b"[\n")  # Start JSON array
+
+        # Records are encoded into one buffer and flushed in large blocks instead of
+        # awaiting a separate thread-pool write for every record and separator
+        async with aiofiles.open(self.file_path, "wb") as f:
             for i, record in enumerate(data):
-                # record = {key: (value.isoformat() if isinstance(value, pd.Timestamp) else value) for key, value in record.items()}
-                json_record = json.dumps(record, ensure_ascii=False, cls=CustomJSONEncoder)
                 if i > 0:
-                    await f.write(",\n")  # Add a comma between records
-                await f.write(json_record)
-            
-            await f.write("\n]")  # End JSON array
+                    buffer += b",\n"  # Add a comma between records
+                buffer += serializer.dumps_bytes(record)
+                if len(buffer) >= WRITE_BUFFER_SIZE:
+                    await f.write(bytes(buffer))
+                    buffer.clear()
+
+            buffer += b"\n]"  # End JSON array
+            await f.write(bytes(buffer))
 
         # # Load existing data if file exists
         # existing_data = []
@@ -481,6 +603,7 @@ class LocalStorage(StorageInterface):
 
     
         
+    @instrumented("retrieve")
     async def retrieve_data(self, query: Dict[str, Any], channel: str = '') -> List[Dict[str, Any]]:
         """Retrieve data from the local file based on the query."""
 
@@ -489,12 +612,16 @@ class LocalStorage(StorageInterface):
 
         try:
             if self.file_format == "json":
-                async with aiofiles.open(self.file_path, "r", encoding="utf-8") as f:
-                    data = json.loads(await f.read())
+                async with aiofiles.open(self.file_path, "rb") as f:
+                    data = get_serializer().loads(await f.read())
             elif self.file_format == "csv":
                 async with aiofiles.open(self.file_path, "r", encoding="utf-8") as f:
                     reader = csv.DictReader(f)
                     data = [row for row in reader]
+            elif self.file_format == "parquet":
+                _, pq = _import_pyarrow()
+                table = await asyncio.to_thread(pq.read_table, self.file_path)
+                data = table.to_pylist()
             else:
                 raise ValueError("Unsupported file format")
 
@@ -3,7 +3,6 @@ import sys
 import getpass
 import asyncio
 from functools import wraps
-from dotenv import load_dotenv
 from typing import List, Dict, Optional
 
 from telethon import TelegramClient
@@ -14,13 +13,10 @@ from telethon.tl.types import Message, MessageMediaPhoto, MessageMediaDocument
 # Setup logger for data_loader
 sys.path.append(os.path.join(os.path.abspath(__file__), '..', '..', '..'))
 from scripts.utils.logger import setup_logger
-from scripts.data_utils.loaders import load_json
+from scripts.utils.metrics import track, record_items, record_bytes
 
 logger = setup_logger("scraper")
 
-# Load environment variables
-load_dotenv()
-
 def download_concurrently(func):
     """Decorator to download concurrently."""
     @wraps(func)
@@ -118,8 +114,12 @@ class TelegramAPI:
                 media_path = os.path.join(media_dir, filename)
                 
                 async with self.semaphore:
-                    media_path = await message.download_media(media_path)
-                    logger.info(f"Downloaded: {media_path}")
+                    with track("download_media"):
+                        media_path = await message.download_media(media_path)
+                    logger.info("Downloaded: %s", media_path)
+                    if media_path:
+                        record_items("download_media", 1)
+                        record_bytes("download_media", os.path.getsize(media_path))
                     return media_path
             
             except Exception as e:
@@ -0,0 +1,48 @@
+import os
+import re
+import sys
+import subprocess
+
+import pytest
+
+from scripts.benchmarks.import_time import SUITES, REPO_ROOT, APP_DIR, check
+
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+TARGETS = [target for suite in SUITES.values() for target in suite]
+
+def skip_if_dependency_missing(error: Exception) -> None:
+    """Skip when a third-party package is not installed; a missing module of our own is a failure."""
+    match = re.search(r"No module named '([^']+)'", str(error))
+    if not match:
+        return
+    top = match.group(1).split(".")[0]
+    if not (os.path.exists(os.path.join(REPO_ROOT, top)) or os.path.exists(os.path.join(APP_DIR, f"{top}.py"))):
+        pytest.skip(f"{top} is not installed")
+
+@pytest.mark.parametrize("module,cwd,forbidden_modules", TARGETS, ids=[module for module, _, _ in TARGETS])
+def test_cold_import_stays_light(module, cwd, forbidden_modules):
+    try:
+        report = check(module, cwd, forbidden_modules, BUDGET_MS, runs=3, top=5)
+    except RuntimeError as e:
+        skip_if_dependency_missing(e)
+        raise
+
+    assert report["forbidden_loaded"] == [], f"{module} imports {report['forbidden_loaded']}"
+    assert report["import_ms"] <= BUDGET_MS, f"{module} took {report['import_ms']} ms: {report['slowest']}"
+
+@pytest.mark.parametrize("module,cwd", [(module, cwd) for module, cwd, _ in TARGETS], ids=[module for module, _, _ in TARGETS])
+def test_cold_import_does_not_load_dotenv(module, cwd):
+    pytest.importorskip("dotenv")
+    # Count load_dotenv calls made while importing; modules should only read .env when they run
+    code = (
+        "import sys, dotenv\n"
+        "calls = []\n"
+        "dotenv.load_dotenv = lambda *args, **kwargs: calls.append(args) or True\n"
+        f"import {module}\n"
+        "sys.exit(3 if calls else 0)\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+    if proc.returncode not in (0, 3):
+        skip_if_dependency_missing(RuntimeError(proc.stderr))
+        pytest.fail(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    assert proc.returncode == 0, f"{module} calls load_dotenv() at import time"
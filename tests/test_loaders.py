@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("yaml")
+
+from scripts.data_utils.loaders import iter_json_array, iter_lines, iter_jsonl
+
+RECORDS = [
+    {"Group ID": 150, "Message": 'he said "buy now" [50% off]', "Price": 150.5},
+    {"Group ID": 151, "Message": "escaped \\\" quote, brackets ] [ and braces } {", "Media Path": []},
+    {"Group ID": 152, "Message": "ዋጋ 1200 ብር 📦", "Links": ["https://t.me/x?a=[1]"]},
+    [1, [2, [3, []]], {"nested": {"deep": [True, False, None]}}],
+    "a plain string with a comma, and a ] bracket",
+    -12345678901234,
+    1e-7,
+    True,
+    None,
+]
+
+def write(tmp_path, text, name="data.json"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+# ==========================================
+# iter_json_array
+# ==========================================
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_iter_json_array_matches_json_load_across_chunk_boundaries(tmp_path, chunk_size):
+    path = write(tmp_path, json.dumps(RECORDS, ensure_ascii=False, indent=2))
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == RECORDS
+
+@pytest.mark.parametrize("chunk_size", [1, 4])
+def test_iter_json_array_compact_separators(tmp_path, chunk_size):
+    path = write(tmp_path, json.dumps(RECORDS, separators=(",", ":")))
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == RECORDS
+
+def test_iter_json_array_number_cut_at_chunk_edge(tmp_path):
+    # "15" decodes on its own; the parser must read on to get 150.5
+    path = write(tmp_path, "[150.5, 2]")
+    assert list(iter_json_array(path, chunk_size=3)) == [150.5, 2]
+
+@pytest.mark.parametrize("text", ["", "   \n\t ", "[]", "  [ \n ]  "])
+def test_iter_json_array_empty(tmp_path, text):
+    assert list(iter_json_array(write(tmp_path, text), chunk_size=2)) == []
+
+def test_iter_json_array_non_array_is_yielded_whole(tmp_path):
+    document = {"channels": ["a", "b"], "note": "[not an array]"}
+    path = write(tmp_path, json.dumps(document))
+    assert list(iter_json_array(path, chunk_size=4)) == [document]
+
+def test_iter_json_array_is_lazy(tmp_path):
+    path = write(tmp_path, json.dumps(RECORDS))
+    items = iter_json_array(path, chunk_size=8)
+    assert next(items) == RECORDS[0]
+    assert next(items) == RECORDS[1]
+
+@pytest.mark.parametrize("text", ['[{"a": 1}, {"b": 2}', '[{"a": "unterminated'])
+def test_iter_json_array_unterminated(tmp_path, text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(write(tmp_path, text), chunk_size=4))
+
+# ==========================================
+# iter_lines / iter_jsonl
+# ==========================================
+
+def test_iter_lines_empty_file(tmp_path):
+    assert list(iter_lines(write(tmp_path, "", "empty.txt"))) == []
+
+@pytest.mark.parametrize("text", [
+    "one\ntwo\nthree\n",
+    "one\ntwo\nthree",  # no trailing newline
+    "\n\nblank lines\n\n",
+    "crlf\r\nendings\r\n",
+    "ዋጋ 📦\nmulti-byte\n",
+])
+def test_iter_lines_keeps_line_endings(tmp_path, text):
+    path = tmp_path / "lines.txt"
+    path.write_bytes(text.encode("utf-8"))
+    lines = list(iter_lines(str(path)))
+    assert "".join(lines) == text
+    assert lines == text.splitlines(keepends=True)
+
+def test_iter_jsonl_skips_blank_lines(tmp_path):
+    records = [{"id": 1, "text": "a\\nb"}, {"id": 2, "text": "ዋጋ"}]
+    text = "\n".join(json.dumps(record, ensure_ascii=False) for record in records)
+    path = write(tmp_path, "\n" + text + "\n\n", "data.jsonl")
+    assert list(iter_jsonl(path)) == records
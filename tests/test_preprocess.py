@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("aiofiles")
+pytest.importorskip("emoji")
+
+from scripts.data_utils.preprocess import merge_files_streaming
+
+def channel_records(channel, dates):
+    return [{"Message": f"{channel}-{index}", "Date": date} for index, date in enumerate(dates)]
+
+def write_channel(data_path, channel, records):
+    (data_path / f"{channel}.json").write_text(json.dumps(records), encoding="utf-8")
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+@pytest.fixture
+def channels(tmp_path):
+    # Ties within and across files, plus records without a date
+    files = {
+        "alpha": channel_records("alpha", ["2025-01-02", "2025-01-01", "2025-01-02", None, "2025-01-03"]),
+        "beta": channel_records("beta", ["2025-01-02", "2025-01-01", "2025-01-02", "2025-01-01"]),
+        "gamma": channel_records("gamma", ["2025-01-03", "", "2025-01-02"]),
+    }
+    for channel, records in files.items():
+        write_channel(tmp_path, channel, records)
+    expected = [dict(record, Channel=channel) for channel in sorted(files) for record in files[channel]]
+    return tmp_path, expected
+
+def date_key(record):
+    return record.get("Date") or ""
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("run_size", [1, 2, 3, 50_000])
+def test_merge_orders_by_date_and_keeps_ties_stable(channels, reverse, run_size):
+    data_path, records = channels
+    # One reader makes the input order deterministic: files in name order, records in file order
+    result = merge_files_streaming(str(data_path), order_by_date=True, reverse=reverse, write_csv=False, max_workers=1, run_size=run_size)
+
+    assert result["records"] == len(records)
+    assert read_jsonl(result["jsonl"]) == sorted(records, key=date_key, reverse=reverse)
+
+def test_merge_with_concurrent_readers_keeps_every_record(channels):
+    data_path, records = channels
+    result = merge_files_streaming(str(data_path), order_by_date=True, write_csv=False, max_workers=3, queue_size=2, run_size=2)
+
+    merged = read_jsonl(result["jsonl"])
+    assert [date_key(record) for record in merged] == sorted(date_key(record) for record in records)
+    assert sorted(merged, key=json.dumps) == sorted(records, key=json.dumps)
+
+def test_merge_csv_uses_union_of_keys(tmp_path):
+    write_channel(tmp_path, "alpha", [{"Message": "a", "Date": "2025-01-01"}])
+    write_channel(tmp_path, "beta", [{"Message": "b", "Date": "2025-01-02", "Links": "x"}])
+    result = merge_files_streaming(str(tmp_path), max_workers=1)
+
+    assert set(result["fieldnames"]) == {"Message", "Date", "Channel", "Links"}
+    with open(result["csv"], encoding="utf-8") as f:
+        assert f.readline().strip().split(",") == result["fieldnames"]
+
+def test_merge_empty_inputs(tmp_path):
+    write_channel(tmp_path, "alpha", [])
+    (tmp_path / "beta.json").write_text("", encoding="utf-8")
+    result = merge_files_streaming(str(tmp_path), order_by_date=True, max_workers=2)
+
+    assert result["records"] == 0
+    assert result["csv"] is None
+    assert read_jsonl(result["jsonl"]) == []
+
+def test_merge_orders_mixed_date_formats_chronologically(tmp_path):
+    # JSON exports use "T" and offsets, CSV exports a space; compared as text they interleave wrongly
+    write_channel(tmp_path, "alpha", [
+        {"Message": "a-0700Z", "Date": "2025-01-01T10:00:00+03:00"},
+        {"Message": "a-0800Z", "Date": "2025-01-01T08:00:00"},
+    ])
+    (tmp_path / "beta.csv").write_text(
+        "Message,Date\nb-0730Z,2025-01-01 07:30:00\nb-0900Z,2025-01-01 09:00:00+00:00\n", encoding="utf-8"
+    )
+    result = merge_files_streaming(str(tmp_path), order_by_date=True, write_csv=False, max_workers=2, run_size=1)
+
+    assert [record["Message"] for record in read_jsonl(result["jsonl"])] == ["a-0700Z", "b-0730Z", "a-0800Z", "b-0900Z"]